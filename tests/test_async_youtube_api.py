@@ -0,0 +1,103 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import asyncio
+import threading
+from typing import Iterator, List
+
+import pytest
+
+pytest.importorskip("pyyoutube")
+pytest.importorskip("youtubesearchpython")
+
+from ytapi.async_youtube_api import AsyncYouTubeAPI
+
+
+class FakeSearch:
+    """
+    Stands in for a synchronous yield_* generator, recording how it was stopped.
+    """
+
+    def __init__(self, pages: int) -> None:
+        self.pages = pages
+        self.closed = threading.Event()
+        self.threads: List[str] = []
+        # Kept alive, so only an explicit close() can stop them.
+        self.generators: List[Iterator[List[int]]] = []
+
+    def __call__(self, *args: object, **kwargs: object) -> Iterator[List[int]]:
+        generator = self._pages()
+        self.generators.append(generator)
+        return generator
+
+    def _pages(self) -> Iterator[List[int]]:
+        try:
+            for page in range(self.pages):
+                self.threads.append(threading.current_thread().name)
+                yield [page]
+        finally:
+            self.threads.append(threading.current_thread().name)
+            self.closed.set()
+
+
+def run_search(search: FakeSearch, stop_after: int) -> List[List[int]]:
+    async def main() -> List[List[int]]:
+        async with AsyncYouTubeAPI("key") as api:
+            api.sync.yield_small_videos = search  # type: ignore
+            results: List[List[int]] = []
+            videos = api.yield_small_videos("minecraft", "en", "US")
+            async for page in videos:
+                results.append(page)
+                if len(results) == stop_after:
+                    break
+            await videos.aclose()  # type: ignore
+            return results
+
+    return asyncio.run(main())
+
+
+def test_yields_every_page_off_the_event_loop() -> None:
+    search = FakeSearch(3)
+    assert run_search(search, stop_after=10) == [[0], [1], [2]]
+    assert search.closed.is_set()
+    assert all(name.startswith("ytapi-driver") for name in search.threads)
+
+
+def test_stopping_early_closes_the_synchronous_generator() -> None:
+    search = FakeSearch(100)
+    assert run_search(search, stop_after=2) == [[0], [1]]
+    assert search.closed.is_set()
+    # Two pages read, then closed, all on the executor's threads.
+    assert len(search.threads) == 3
+    assert all(name.startswith("ytapi-driver") for name in search.threads)
+
+
+def test_lookups_run_on_their_own_pool_bounded_by_its_size() -> None:
+    lock = threading.Lock()
+    running: List[int] = [0, 0]
+    names: List[str] = []
+
+    def lookup(item: int) -> int:
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+            names.append(threading.current_thread().name)
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+        return item * 2
+
+    async def main() -> List[int]:
+        async with AsyncYouTubeAPI("key", max_concurrency=3) as api:
+            api._bind_loop()
+            return await asyncio.get_running_loop().run_in_executor(None, api._map, lookup, list(range(12)))
+
+    assert asyncio.run(main()) == [item * 2 for item in range(12)]
+    assert 1 < running[1] <= 3
+    assert all(name.startswith("ytapi-async") for name in names)
@@ -0,0 +1,76 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import json
+from typing import List
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+pyyoutube = pytest.importorskip("pyyoutube")
+requests = pytest.importorskip("requests")
+
+from ytapi.backend import Backend  # noqa: E402
+from ytapi.data_api_search import DATA_API_SEARCH  # noqa: E402
+from ytapi.entity_cache import EntityCaches  # noqa: E402
+from ytapi.quota import QuotaTracker  # noqa: E402
+from ytapi.result_delta import ResultDelta  # noqa: E402
+from ytapi.single_flight import InFlightLookups  # noqa: E402
+from ytapi.youtube_api import YouTubeAPI  # noqa: E402
+
+
+def respond(resource: str, args: dict) -> dict:
+    if resource == "search":
+        page = int(args.get("pageToken") or 0)
+        return {"nextPageToken": str(page + 1), "items": [{"id": {"videoId": f"v{page}_{n}"}} for n in range(50)]}
+    elif resource == "videos":
+        return {"items": [{"id": video_id, "snippet": {"publishedAt": "2099-01-01T00:00:00Z", "channelId": f"c{video_id}"}, "statistics": {"viewCount": "10"}, "contentDetails": {"duration": "PT3M"}} for video_id in args["id"].split(",")]}
+    return {"items": [{"id": channel_id, "statistics": {"subscriberCount": "5"}} for channel_id in args["id"].split(",")]}
+
+
+@pytest.fixture
+def resources(monkeypatch) -> List[str]:
+    sent: List[str] = []
+
+    def request(api, resource, method=None, args=None, post_args=None, enforce_auth=True):
+        sent.append(resource)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(respond(resource, args)).encode("utf-8")
+        return response
+
+    monkeypatch.setattr(pyyoutube.Api, "_request", request)
+    return sent
+
+
+def run_videos_search(monkeypatch, max_quota: int) -> List[ResultDelta]:
+    api = YouTubeAPI("key", caches=EntityCaches(), search_backend=DATA_API_SEARCH, quota=QuotaTracker(), in_flight=InFlightLookups())
+    backend = Backend(None)
+    monkeypatch.setattr(backend, "getYouTubeAPI", lambda key: api)
+    monkeypatch.setattr(backend, "getMaxQuota", lambda: max_quota)
+    deltas: List[ResultDelta] = []
+    backend.searchVideosResults.connect(deltas.append)
+    backend.searchVideos("key", "Less than 4", "minecraft", 500, 14, "en", "US")
+    return deltas
+
+
+def test_channels_of_the_video_table_count_against_the_search_budget(monkeypatch, resources, capsys):
+    # Two search pages, with their videos and the channels of those, fit in 250 units; the third page does not.
+    deltas = run_videos_search(monkeypatch, 250)
+    assert sorted(resources) == ["channels", "channels", "search", "search", "videos", "videos"]
+    assert len(deltas[-1].added) == 50
+    assert "The videos search used 204 quota units (search: 200, videos: 2, channels: 2)" in capsys.readouterr().out
+
+
+def test_stops_when_the_channels_are_over_budget(monkeypatch, resources, capsys):
+    deltas = run_videos_search(monkeypatch, 101)
+    assert resources == ["search", "videos"]
+    # The videos found are still shown, without their channels.
+    assert [channel for _, channel in deltas[-1].added] == [None] * 50
+    assert "The videos search used 101 quota units" in capsys.readouterr().out
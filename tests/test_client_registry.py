@@ -0,0 +1,42 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import pytest
+
+pytest.importorskip("pyyoutube")
+pytest.importorskip("requests")
+
+from ytapi.client_registry import ClientRegistry  # noqa: E402
+
+
+def test_one_client_per_key():
+    registry = ClientRegistry()
+    assert registry.api("a") is registry.api("a")
+    assert registry.api("a") is not registry.api("b")
+
+
+def test_resizing_the_pool_closes_the_old_adapter():
+    registry = ClientRegistry(pool_size=4)
+    session = registry.api("a").session
+    old_adapter = session.adapters["https://"]
+    closed = []
+    old_adapter.close = lambda: closed.append(old_adapter)
+    registry.ensure_pool_size(2)
+    registry.configure(timeout=(1.0, 2.0))
+    assert session.adapters["https://"] is old_adapter
+    registry.ensure_pool_size(8)
+    assert session.adapters["https://"] is not old_adapter
+    assert session.adapters["https://"]._pool_maxsize == 8
+    assert closed == [old_adapter]
+    assert registry.api("a")._timeout == (1.0, 2.0)
+
+
+def test_keeps_the_default_user_agent():
+    registry = ClientRegistry()
+    assert registry.api("a").session.headers["User-Agent"].startswith("python-requests")
@@ -0,0 +1,41 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from ytapi import ranking
+from ytapi.ranking import TopK
+
+
+def test_keeps_the_highest_keys_in_arrival_order_for_ties():
+    top: TopK[str] = TopK(3)
+    for item, key in (("a", 1), ("b", 5), ("c", 3), ("d", 5), ("e", 0)):
+        top.push(item, key)
+    assert top.items() == ["b", "d", "c"]
+
+
+def test_sorts_again_only_after_an_item_gets_in(monkeypatch):
+    top: TopK[str] = TopK(2)
+    top.push("a", 2)
+    top.push("b", 1)
+    sorts = []
+    real_sorted = sorted
+    monkeypatch.setattr(ranking, "sorted", lambda *args, **kwargs: sorts.append(1) or real_sorted(*args, **kwargs), raising=False)
+    assert top.items() == ["a", "b"]
+    assert not top.push("c", 0)
+    assert top.items() == ["a", "b"]
+    assert len(sorts) == 1
+    assert top.push("d", 3)
+    assert top.items() == ["d", "a"]
+    assert len(sorts) == 2
+
+
+def test_items_can_be_changed_by_the_caller():
+    top: TopK[str] = TopK(2)
+    top.push("a", 1)
+    top.items().append("b")
+    assert top.items() == ["a"]
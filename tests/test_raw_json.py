@@ -0,0 +1,103 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import json
+
+import pytest
+
+pyyoutube = pytest.importorskip("pyyoutube")
+requests = pytest.importorskip("requests")
+
+from ytapi.raw_json import RawEntity, dumps, items_of, loads, parse_response  # noqa: E402
+from ytapi.request_executor import is_rate_limited, is_transient  # noqa: E402
+
+VIDEO = {
+    "id": "v1",
+    "snippet": {"title": "A video", "publishedAt": "2022-03-01T10:00:00Z", "thumbnails": {"default": {"url": "https://i.ytimg.com/v1.jpg", "width": 120}}},
+    "statistics": {"viewCount": "1234", "likeCount": "56", "commentCount": "7"},
+    "contentDetails": {"duration": "PT3M20S"},
+}
+CHANNEL = {"id": "c1", "statistics": {"subscriberCount": "1000", "viewCount": "20000", "videoCount": "30", "hiddenSubscriberCount": False}}
+
+
+def response(status_code: int, body: bytes, content_type: str = "application/json") -> "requests.Response":
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers["Content-Type"] = content_type
+    response.url = "https://www.googleapis.com/youtube/v3/videos"
+    return response
+
+
+def test_parses_a_successful_response():
+    assert parse_response(response(200, dumps({"items": [VIDEO]}))) == {"items": [VIDEO]}
+
+
+def test_api_errors_raise_pyyoutube_exceptions():
+    body = {"error": {"code": 403, "message": "Slow down", "errors": [{"reason": "rateLimitExceeded"}]}}
+    with pytest.raises(pyyoutube.PyYouTubeException) as raised:
+        parse_response(response(403, json.dumps(body).encode("utf-8")))
+    assert raised.value.status_code == 403
+    assert is_rate_limited(raised.value)
+
+
+@pytest.mark.parametrize("status_code, body", [(503, b"<html><body>Service Unavailable</body></html>"), (429, b""), (502, b"null")])
+def test_error_pages_without_json_are_transient(status_code, body):
+    with pytest.raises(requests.HTTPError) as raised:
+        parse_response(response(status_code, body, "text/html"))
+    assert raised.value.response.status_code == status_code
+    assert is_transient(raised.value)
+
+
+def test_client_error_pages_are_not_transient():
+    with pytest.raises(requests.HTTPError) as raised:
+        parse_response(response(404, b"<html>Not Found</html>", "text/html"))
+    assert not is_transient(raised.value)
+
+
+def test_a_successful_response_that_is_not_json_is_not_hidden():
+    with pytest.raises(ValueError):
+        parse_response(response(200, b"<html></html>", "text/html"))
+
+
+@pytest.mark.parametrize("body", [b"null", b"[]", b'"items"', b"3"])
+def test_a_successful_response_that_is_not_a_json_object_is_malformed(body):
+    with pytest.raises(ValueError):
+        parse_response(response(200, body))
+
+
+def test_reads_fields_like_the_models():
+    video, = items_of({"items": [loads(dumps(VIDEO))]}, pyyoutube.Video)
+    assert video.id == "v1"
+    assert video.snippet.thumbnails.default.url == "https://i.ytimg.com/v1.jpg"
+    assert video.snippet.description is None
+    assert (video.statistics.viewCount, video.statistics.likeCount, video.statistics.commentCount) == (1234, 56, 7)
+    assert video.to_dict() == VIDEO
+    channel = RawEntity(CHANNEL, pyyoutube.Channel)
+    assert (channel.statistics.subscriberCount, channel.statistics.viewCount, channel.statistics.videoCount) == (1000, 20000, 30)
+    assert channel.statistics.hiddenSubscriberCount is False
+
+
+def test_to_model_builds_the_pyyoutube_model_once():
+    video = RawEntity(VIDEO, pyyoutube.Video)
+    model = video.to_model()
+    assert isinstance(model, pyyoutube.Video)
+    assert model.id == "v1"
+    assert model.snippet.title == "A video"
+    assert model.statistics.viewCount == video.statistics.viewCount == 1234
+    assert model.contentDetails.get_video_seconds_duration() == 200
+    assert video.to_model() is model
+    channel = RawEntity(CHANNEL, pyyoutube.Channel).to_model()
+    assert isinstance(channel, pyyoutube.Channel)
+    assert channel.statistics.subscriberCount == 1000
+
+
+def test_only_top_level_entities_have_a_model():
+    with pytest.raises(TypeError):
+        RawEntity(VIDEO, pyyoutube.Video).statistics.to_model()
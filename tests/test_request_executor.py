@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import threading
+import time
+from typing import Callable, List
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from ytapi.request_executor import HEDGE_WORKERS, RequestExecutor  # noqa: E402
+
+HEDGE_AFTER = 0.05
+
+
+class SlowFirstAttempt:
+    """
+    The first call is slow and fails, as a request stuck until its read timeout does; later calls answer at once.
+    """
+
+    def __init__(self, delay: float = 0.5) -> None:
+        self.delay = delay
+        self.threads: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self._lock:
+            self.threads.append(threading.current_thread().name)
+            first = len(self.threads) == 1
+        if first:
+            time.sleep(self.delay)
+            raise ValueError("read timed out")
+        return "hedged"
+
+
+def test_without_hedging_the_request_runs_on_the_calling_thread():
+    threads: List[str] = []
+    executor = RequestExecutor()
+    assert executor.run(lambda: threads.append(threading.current_thread().name) or "ok", hedge=True) == "ok"
+    assert threads == [threading.current_thread().name]
+
+
+def test_hedge_answers_for_a_slow_failed_first_attempt():
+    executor = RequestExecutor(hedge_after=HEDGE_AFTER)
+    fn = SlowFirstAttempt()
+    assert executor.run(fn, hedge=True) == "hedged"
+    assert fn.threads == [threading.current_thread().name, "ytapi-hedge"]
+
+
+def test_no_hedge_for_a_quick_answer():
+    executor = RequestExecutor(hedge_after=HEDGE_AFTER)
+    calls: List[int] = []
+    assert executor.run(lambda: calls.append(1) or "ok", hedge=True) == "ok"
+    time.sleep(HEDGE_AFTER * 3)
+    assert calls == [1]
+
+
+def test_no_hedge_without_an_idle_worker():
+    executor = RequestExecutor(hedge_after=HEDGE_AFTER, max_attempts=1)
+    for _ in range(HEDGE_WORKERS):
+        executor._hedge_slots.acquire()
+    fn = SlowFirstAttempt(delay=HEDGE_AFTER * 4)
+    with pytest.raises(ValueError):
+        executor.run(fn, hedge=True)
+    assert fn.threads == [threading.current_thread().name]
+
+
+def flaky(calls: List[int]) -> Callable[[], str]:
+    def fn() -> str:
+        calls.append(1)
+        if len(calls) == 1:
+            raise requests.exceptions.ConnectionError("connection reset")
+        return "ok"
+    return fn
+
+
+def test_transient_failures_are_retried():
+    calls: List[int] = []
+    assert RequestExecutor(base_delay=0).run(flaky(calls)) == "ok"
+    assert len(calls) == 2
+
+
+def test_calls_that_change_state_are_sent_once():
+    calls: List[int] = []
+    with pytest.raises(requests.exceptions.ConnectionError):
+        RequestExecutor(base_delay=0).run(flaky(calls), retry=False)
+    assert len(calls) == 1
@@ -0,0 +1,84 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from typing import List
+
+import pytest
+
+from ytapi.result_delta import DeltaTracker, ResultDelta, ResultStore
+
+
+def key(item: str) -> str:
+    return item.split("=")[0]
+
+
+def test_first_snapshot_is_all_added_even_when_empty():
+    tracker: DeltaTracker[str] = DeltaTracker(key)
+    assert tracker.diff([]) == ResultDelta(1)
+    assert tracker.diff(["a=1", "b=2"]) == ResultDelta(2, added=["a=1", "b=2"])
+
+
+def test_unchanged_snapshot_gives_no_delta():
+    tracker: DeltaTracker[str] = DeltaTracker(key)
+    tracker.diff(["a=1", "b=2"])
+    assert tracker.diff(["a=1", "b=2"]) is None
+
+
+def test_removed_added_and_reordered_keys():
+    tracker: DeltaTracker[str] = DeltaTracker(key)
+    tracker.diff(["a=1", "b=2", "c=3"])
+    assert tracker.diff(["a=1", "c=3", "d=4"]) == ResultDelta(2, added=["d=4"], removed=["b"])
+    assert tracker.diff(["d=4", "a=1", "c=3"]) == ResultDelta(3, order=["d", "a", "c"])
+
+
+def test_first_item_wins_for_a_repeated_key():
+    tracker: DeltaTracker[str] = DeltaTracker(key)
+    assert tracker.diff(["a=1", "a=2"]) == ResultDelta(1, added=["a=1"])
+
+
+def replay(snapshots: List[List[str]]) -> ResultStore[str]:
+    tracker: DeltaTracker[str] = DeltaTracker(key)
+    store: ResultStore[str] = ResultStore(key)
+    for snapshot in snapshots:
+        delta = tracker.diff(snapshot)
+        if delta is not None:
+            store.apply(delta)
+        assert store.items == snapshot
+    return store
+
+
+def test_store_rebuilds_every_snapshot():
+    replay([["a=1"], ["a=1", "b=2"], ["b=2", "a=1", "c=3"], ["c=3"], [], ["e=5", "d=4"]])
+
+
+def test_store_reports_removed_rows_and_the_first_changed_row():
+    store: ResultStore[str] = ResultStore(key)
+    store.apply(ResultDelta(1, added=["a=1", "b=2", "c=3", "d=4"]))
+    change = store.apply(ResultDelta(2, added=["e=5"], removed=["b", "d"]))
+    assert change.removed_rows == [1, 3]
+    assert change.first_changed_row == 2
+    change = store.apply(ResultDelta(3, order=["a", "e", "c"]))
+    assert change.removed_rows == []
+    assert change.first_changed_row == 1
+    assert store.items == ["a=1", "e=5", "c=3"]
+
+
+def test_store_starts_over_on_a_new_search():
+    store: ResultStore[str] = ResultStore(key)
+    store.apply(ResultDelta(1, added=["a=1"]))
+    store.apply(ResultDelta(2, added=["b=2"]))
+    store.apply(ResultDelta(1, added=["c=3"]))
+    assert (store.items, store.seq) == (["c=3"], 1)
+
+
+def test_store_rejects_a_missed_delta():
+    store: ResultStore[str] = ResultStore(key)
+    store.apply(ResultDelta(1, added=["a=1"]))
+    with pytest.raises(ValueError):
+        store.apply(ResultDelta(3, added=["b=2"]))
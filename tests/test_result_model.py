@@ -0,0 +1,86 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from typing import Dict, List, Tuple
+
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from ytapi.result_delta import DeltaTracker, ResultDelta  # noqa: E402
+from ytapi.result_model import ResultTableModel, addCommas  # noqa: E402
+
+
+def key(item: str) -> str:
+    return item.split("=")[0]
+
+
+def columnsFor(items: List[str]) -> Dict[str, list]:
+    return {"Name": [key(item) for item in items], "Views": [int(item.split("=")[1]) for item in items]}
+
+
+@pytest.fixture
+def model() -> ResultTableModel:
+    if QtCore.QCoreApplication.instance() is None:
+        QtCore.QCoreApplication([])
+    return ResultTableModel(key, columnsFor)
+
+
+def rows(model: ResultTableModel) -> List[Tuple[str, str]]:
+    return [tuple(model.data(model.index(row, column)) for column in range(model.columnCount())) for row in range(model.rowCount())]
+
+
+def record(model: ResultTableModel) -> List[tuple]:
+    events: List[tuple] = []
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("inserted", first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("removed", first, last)))
+    model.dataChanged.connect(lambda topLeft, bottomRight: events.append(("changed", topLeft.row(), bottomRight.row())))
+    model.modelReset.connect(lambda: events.append(("reset",)))
+    return events
+
+
+def test_formats_numbers_only_when_shown(model):
+    model.applyDelta(ResultDelta(1, added=["a=1234567"]))
+    assert model.headerData(1, QtCore.Qt.Horizontal) == "Views"
+    assert rows(model) == [("a", "1,234,567")]
+    assert addCommas("123") == "123"
+
+
+def test_follows_every_snapshot_of_a_search(model):
+    tracker: DeltaTracker[str] = DeltaTracker(key)
+    for snapshot in (["a=1"], ["a=1", "b=2"], ["b=2", "c=3", "a=1"], ["c=3"], []):
+        delta = tracker.diff(snapshot)
+        if delta is not None:
+            model.applyDelta(delta)
+        assert [name for name, _ in rows(model)] == [key(item) for item in snapshot]
+        assert model.items == snapshot
+
+
+def test_appends_and_removes_rows_in_place(model):
+    model.applyDelta(ResultDelta(1, added=["a=1", "b=2", "c=3", "d=4"]))
+    events = record(model)
+    model.applyDelta(ResultDelta(2, added=["e=5"], removed=["b", "c"]))
+    assert events == [("removed", 1, 2), ("inserted", 2, 2)]
+    assert rows(model) == [("a", "1"), ("d", "4"), ("e", "5")]
+
+
+def test_reordering_updates_only_the_moved_rows(model):
+    model.applyDelta(ResultDelta(1, added=["a=1", "b=2", "c=3"]))
+    events = record(model)
+    model.applyDelta(ResultDelta(2, added=["d=4"], order=["a", "d", "b", "c"]))
+    assert events == [("changed", 1, 2), ("inserted", 3, 3)]
+    assert rows(model) == [("a", "1"), ("d", "4"), ("b", "2"), ("c", "3")]
+
+
+def test_a_new_search_resets_the_model(model):
+    model.applyDelta(ResultDelta(1, added=["a=1"]))
+    events = record(model)
+    model.applyDelta(ResultDelta(1, added=["b=2"]))
+    assert events == [("reset",), ("inserted", 0, 0)]
+    assert rows(model) == [("b", "2")]
@@ -0,0 +1,66 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import threading
+from typing import Dict, List
+
+import pytest
+
+pytest.importorskip("pyyoutube")
+
+from ytapi.cancellation import CancelToken, SearchCancelled  # noqa: E402
+from ytapi.single_flight import SingleFlight  # noqa: E402
+
+
+class SlowFetch:
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls: List[List[str]] = []
+
+    def __call__(self, ids: List[str]) -> Dict[str, str]:
+        self.calls.append(list(ids))
+        self.started.set()
+        self.release.wait(5)
+        return {entity_id: entity_id.upper() for entity_id in ids}
+
+
+def start_owner(flight: SingleFlight[str], fetch: SlowFetch, results: dict) -> threading.Thread:
+    owner = threading.Thread(target=lambda: results.update(flight.run("en", ["a"], fetch)))
+    owner.start()
+    assert fetch.started.wait(5)
+    return owner
+
+
+def test_waiters_share_the_request_in_flight():
+    flight: SingleFlight[str] = SingleFlight()
+    fetch = SlowFetch()
+    owned: dict = {}
+    owner = start_owner(flight, fetch, owned)
+    fetch.release.set()
+    assert flight.run("en", ["a", "b"], fetch) == {"a": "A", "b": "B"}
+    owner.join(5)
+    assert owned == {"a": "A"}
+    assert fetch.calls == [["a"], ["b"]]
+    assert flight.in_flight() == 0
+
+
+def test_a_cancelled_waiter_stops_waiting_while_the_request_completes():
+    flight: SingleFlight[str] = SingleFlight()
+    fetch = SlowFetch()
+    owned: dict = {}
+    owner = start_owner(flight, fetch, owned)
+    cancel_token = CancelToken()
+    cancel_token.cancel()
+    with pytest.raises(SearchCancelled):
+        flight.run("en", ["a"], fetch, cancel_token)
+    fetch.release.set()
+    owner.join(5)
+    assert owned == {"a": "A"}
+    assert fetch.calls == [["a"]]
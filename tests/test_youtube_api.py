@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import json
+from typing import List
+
+import pytest
+
+pyyoutube = pytest.importorskip("pyyoutube")
+requests = pytest.importorskip("requests")
+pytest.importorskip("youtubesearchpython")
+
+from ytapi.entity_cache import EntityCaches  # noqa: E402
+from ytapi.quota import QuotaBudgetExceeded, QuotaLedger, QuotaTracker  # noqa: E402
+from ytapi.request_executor import RequestExecutor  # noqa: E402
+from ytapi.youtube_api import YouTubeAPI  # noqa: E402
+
+
+@pytest.fixture
+def requested_ids(monkeypatch) -> List[List[str]]:
+    sent: List[List[str]] = []
+
+    def request(api, resource, method=None, args=None, post_args=None, enforce_auth=True):
+        ids = args["id"].split(",")
+        sent.append(ids)
+        # Deleted comments are left out of the response.
+        items = [{"id": comment_id, "snippet": {"textDisplay": f"text of {comment_id}"}} for comment_id in ids if not comment_id.startswith("gone")]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"items": items}).encode("utf-8")
+        return response
+
+    monkeypatch.setattr(pyyoutube.Api, "_request", request)
+    return sent
+
+
+def test_comments_are_fetched_fifty_ids_at_a_time(requested_ids):
+    api = YouTubeAPI("key", caches=EntityCaches(), quota=QuotaTracker())
+    comment_ids = [f"c{n}" for n in range(110)] + ["gone1", "c3"]
+    comments = api._get_comments_by_ids(comment_ids, api.request_context())
+    assert [len(ids) for ids in requested_ids] == [50, 50, 11]
+    # In the order requested, without duplicates or the comments that could not be found.
+    assert [comment.id for comment in comments] == [f"c{n}" for n in range(110)]
+    assert comments[0].snippet.textDisplay == "text of c0"
+
+
+def test_cached_comments_are_not_requested_again(requested_ids):
+    api = YouTubeAPI("key", caches=EntityCaches(), quota=QuotaTracker())
+    api._get_comments_by_ids(["c1", "c2"], api.request_context())
+    comments = api._get_comments_by_ids(["c2", "c3"], api.request_context())
+    assert requested_ids == [["c1", "c2"], ["c3"]]
+    assert [comment.id for comment in comments] == ["c2", "c3"]
+
+
+@pytest.fixture
+def flaky_requests(monkeypatch) -> List[str]:
+    sent: List[str] = []
+
+    def request(api, resource, method=None, args=None, post_args=None, enforce_auth=True):
+        sent.append(resource)
+        if len(sent) == 1:
+            raise requests.exceptions.ConnectionError("connection reset")
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"items": []}).encode("utf-8")
+        return response
+
+    monkeypatch.setattr(pyyoutube.Api, "_request", request)
+    return sent
+
+
+def test_every_attempt_sent_is_charged_to_the_search_and_the_key(flaky_requests):
+    quota = QuotaTracker()
+    api = YouTubeAPI("key", quota=quota, executor=RequestExecutor(base_delay=0))
+    ledger = QuotaLedger()
+    api._call("videos", api.request_context(ledger=ledger), id="v1")
+    assert flaky_requests == ["videos", "videos"]
+    assert ledger.total == quota.usage(["key"])[0].units == 2
+
+
+def test_a_retry_over_budget_is_not_sent(flaky_requests):
+    quota = QuotaTracker()
+    api = YouTubeAPI("key", quota=quota, executor=RequestExecutor(base_delay=0))
+    ledger = QuotaLedger(max_quota=1)
+    with pytest.raises(QuotaBudgetExceeded):
+        api._call("videos", api.request_context(ledger=ledger), id="v1")
+    assert flaky_requests == ["videos"]
+    assert ledger.total == quota.usage(["key"])[0].units == 1
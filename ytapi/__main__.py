@@ -7,9 +7,12 @@
 # Authors:
 # - Scott Jones <scott.jones9336@gmail.com>
 # -----------------------------------------------------------------------------------------------------
-from ytapi.backend import Backend
+from ytapi.client_registry import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, client_registry
 from ytapi.gui import MainWindow
 from ytapi.pyside.app import createApplication 
+from ytapi.request_executor import DEFAULT_BURST, DEFAULT_MAX_ATTEMPTS, DEFAULT_RATE, request_executor
+from ytapi.search_scheduler import DEFAULT_NUM_WORKERS, SearchScheduler
+from ytapi.update_coalescer import UpdateCoalescer
 import sys
 from PySide6 import QtCore
 
@@ -17,33 +20,52 @@ if __name__ == "__main__":
     app=createApplication(sys.argv, "YouTube MineCraft Scraper", "Scott Jones")
     
     frontend = MainWindow(None)
-    backendVids = Backend(None)
-    backendChannels = Backend(None)
-    backendComs = Backend(None)
+    settings=QtCore.QSettings()
+    # Every search made with the same key shares one pooled keep-alive session.
+    client_registry.configure(
+        pool_size=int(settings.value("httpPoolSize", DEFAULT_POOL_SIZE)),
+        timeout=(float(settings.value("httpConnectTimeout", DEFAULT_TIMEOUT[0])), float(settings.value("httpReadTimeout", DEFAULT_TIMEOUT[1]))),
+    )
+    # Every request to YouTube shares one rate limiter; a hedgeAfterSeconds of 0 leaves hedging off.
+    request_executor.configure(
+        rate=float(settings.value("requestsPerSecond", DEFAULT_RATE)),
+        burst=int(settings.value("requestBurst", DEFAULT_BURST)),
+        max_attempts=int(settings.value("requestAttempts", DEFAULT_MAX_ATTEMPTS)),
+        hedge_after=float(settings.value("hedgeAfterSeconds", 0)),
+    )
+    numWorkers=int(settings.value("searchWorkers", DEFAULT_NUM_WORKERS))
+    scheduler = SearchScheduler(numWorkers)
+    app.aboutToQuit.connect(scheduler.shutdown)
+    app.aboutToQuit.connect(client_registry.close)
 
-    backendVidsThread=QtCore.QThread(None)
-    backendVids.moveToThread(backendVidsThread)
-    backendVidsThread.start()
-    backendChannelsThread=QtCore.QThread(None)
-    backendChannels.moveToThread(backendChannelsThread)
-    backendChannelsThread.start()
-    backendComsThread=QtCore.QThread(None)
-    backendComs.moveToThread(backendComsThread)
-    backendComsThread.start()
     frontendThread=QtCore.QThread(None)
     frontend.moveToThread(frontendThread)
     frontendThread.start()
 
-    frontend.searchVideosRequested.connect(backendVids.onSearchVideosRequested)
-    backendVids.searchVideosResults.connect(frontend.onSearchVideosResults)
-    backendVids.searchVideosComplete.connect(frontend.onSearchVideosComplete)
+    # Results reach the tables through coalescers on the GUI thread, so a fast search cannot flood the view.
+    videosCoalescer = UpdateCoalescer(lambda pair: pair[0].id)
+    channelsCoalescer = UpdateCoalescer(lambda channel: channel.id)
+    commentsCoalescer = UpdateCoalescer(lambda comment: comment.id)
 
-    frontend.searchChannelRequested.connect(backendVids.onSearchChannelRequested)
-    backendVids.searchChannelResults.connect(frontend.onSearchChannelResults)
-    backendVids.searchChannelComplete.connect(frontend.onSearchChannelComplete)
+    frontend.searchVideosRequested.connect(scheduler.onSearchVideosRequested)
+    frontend.searchChannelRequested.connect(scheduler.onSearchChannelRequested)
+    frontend.searchCommentsRequested.connect(scheduler.onSearchCommentsRequested)
+    frontend.searchStopRequested.connect(scheduler.cancel)
+    scheduler.queueDepthChanged.connect(frontend.onQueueDepthChanged)
 
-    frontend.searchCommentsRequested.connect(backendVids.onSearchCommentsRequested)
-    backendVids.searchCommentsResults.connect(frontend.onSearchCommentsResults)
-    backendVids.searchCommentsComplete.connect(frontend.onSearchCommentsComplete)
+    for worker in scheduler.workers:
+        worker.searchVideosResults.connect(videosCoalescer.onResults)
+        worker.searchVideosComplete.connect(videosCoalescer.onComplete)
+        worker.searchChannelResults.connect(channelsCoalescer.onResults)
+        worker.searchChannelComplete.connect(channelsCoalescer.onComplete)
+        worker.searchCommentsResults.connect(commentsCoalescer.onResults)
+        worker.searchCommentsComplete.connect(commentsCoalescer.onComplete)
+
+    videosCoalescer.results.connect(frontend.onSearchVideosResults)
+    videosCoalescer.complete.connect(frontend.onSearchVideosComplete)
+    channelsCoalescer.results.connect(frontend.onSearchChannelResults)
+    channelsCoalescer.complete.connect(frontend.onSearchChannelComplete)
+    commentsCoalescer.results.connect(frontend.onSearchCommentsResults)
+    commentsCoalescer.complete.connect(frontend.onSearchCommentsComplete)
 
     frontend.exec_()
\ No newline at end of file
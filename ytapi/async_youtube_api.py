@@ -0,0 +1,139 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from pyyoutube import Channel, Comment, Video
+
+from ytapi.concurrency import in_mapped_task, run_as_mapped_task, sequential_map
+from ytapi.field_masks import CHANNEL_MASK, VIDEO_MASK, FieldMask
+from ytapi.request_context import RequestContext
+from ytapi.response_cache import ResponseCache
+from ytapi.youtube_api import ChannelActivity, YouTubeAPI
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncYouTubeAPI:
+    """
+    Asyncio front end to YouTubeAPI.
+
+    The yield_* methods return async generators mirroring the synchronous ones. Every independent lookup
+    they make (id chunks and per channel uploads) is scheduled on the event loop and
+    run concurrently on a pool of max_concurrency workers, over one keep-alive session.
+
+    A caller stopping early should aclose() the async generator, which closes the synchronous one and
+    stops its pipeline threads; otherwise that only happens once the async generator is collected.
+    """
+
+    def __init__(self, api_key: str, language: str = "en", region: str = "US", max_concurrency: int = DEFAULT_MAX_CONCURRENCY, response_cache: Optional[ResponseCache] = None) -> None:
+        self.max_concurrency: int = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ytapi-async")
+        # Steps the synchronous generators, kept apart from the lookup workers they wait on.
+        self._driver = ThreadPoolExecutor(thread_name_prefix="ytapi-driver")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.sync: YouTubeAPI = YouTubeAPI(api_key, language=language, region=region, response_cache=response_cache, mapper=self._map)
+        self.sync.clients.ensure_pool_size(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncYouTubeAPI":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._driver.shutdown(wait=False)
+        self._executor.shutdown(wait=False)
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+        return loop
+
+    def _map(self, fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        loop = self._loop
+        if loop is None or len(items) < 2 or in_mapped_task() or threading.get_ident() == self._loop_thread:
+            return sequential_map(fn, items)
+        futures = [asyncio.run_coroutine_threadsafe(self._lookup(fn, item), loop) for item in items]
+        return [future.result() for future in futures]
+
+    async def _lookup(self, fn: Callable[[Any], T], item: Any) -> T:
+        assert self._loop is not None
+        result: T = await self._loop.run_in_executor(self._executor, run_as_mapped_task, fn, item)
+        return result
+
+    async def _run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = self._bind_loop()
+        return await loop.run_in_executor(self._driver, partial(fn, *args, **kwargs))
+
+    async def _iterate(self, iterable: Iterable[T]) -> AsyncIterator[T]:
+        loop = self._bind_loop()
+        generator = iter(iterable)
+        done = object()
+        step: Optional[Future] = None
+        try:
+            while True:
+                step = self._driver.submit(next, generator, done)
+                item = await asyncio.wrap_future(step, loop=loop)
+                if item is done:
+                    break
+                yield item
+        finally:
+            await loop.run_in_executor(self._driver, self._close_generator, generator, step)
+
+    @staticmethod
+    def _close_generator(generator: Iterator[T], step: Optional[Future]) -> None:
+        # A generator cannot be closed while it is running, which it still is if the caller was cancelled mid step.
+        if step is not None:
+            wait([step])
+        close = getattr(generator, "close", None)
+        if close is not None:
+            close()
+
+    async def get_channel_info_by_id(self, channel_id: str, context: Optional[RequestContext] = None, mask: FieldMask = CHANNEL_MASK) -> Optional[Channel]:
+        return await self._run(self.sync.get_channel_info_by_id, channel_id, context=context, mask=mask)
+
+    async def get_channels_by_ids(self, channel_ids: Iterable[Optional[str]], context: Optional[RequestContext] = None, mask: FieldMask = CHANNEL_MASK) -> Dict[str, Channel]:
+        return await self._run(self.sync.get_channels_by_ids, list(channel_ids), context=context, mask=mask)
+
+    async def get_videos_by_ids(self, video_ids: Iterable[str], language: Optional[str] = None, region: Optional[str] = None, context: Optional[RequestContext] = None, mask: FieldMask = VIDEO_MASK) -> Tuple[List[Video], List[str]]:
+        return await self._run(self.sync.get_videos_by_ids, list(video_ids), language=language, region=region, context=context, mask=mask)
+
+    async def sort_by_subscribers(self, channels: Iterable[Channel]) -> List[Channel]:
+        return self.sync.sort_by_subscribers(channels)
+
+    async def sort_by_recent_views(self, channels: Iterable[Channel], time_delta: int, activities: Optional[Dict[str, ChannelActivity]] = None, context: Optional[RequestContext] = None) -> List[Channel]:
+        return await self._run(self.sync.sort_by_recent_views, list(channels), time_delta, activities, context=context)
+
+    def yield_small_channels(self, niche: str, num_channels: int = 100, time_delta: int = 14, subscriber_range: Tuple[int, int] = (1000, 200000), activities: Optional[Dict[str, ChannelActivity]] = None, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> AsyncIterator[List[Channel]]:
+        return self._iterate(self.sync.yield_small_channels(niche, num_channels=num_channels, time_delta=time_delta, subscriber_range=subscriber_range, activities=activities, max_quota=max_quota, context=context))
+
+    def yield_most_viewed_videos(self, niche: str, num_videos: int, language: str, region: str, time_delta: int = 14, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> AsyncIterator[List[Video]]:
+        return self._iterate(self.sync.yield_most_viewed_videos(niche, num_videos, language, region, time_delta=time_delta, max_quota=max_quota, context=context))
+
+    def yield_small_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 14, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> AsyncIterator[List[Video]]:
+        return self._iterate(self.sync.yield_small_videos(niche, language, region, num_videos=num_videos, time_delta=time_delta, max_quota=max_quota, context=context))
+
+    def yield_pushed_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 14, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> AsyncIterator[List[Video]]:
+        return self._iterate(self.sync.yield_pushed_videos(niche, language, region, num_videos=num_videos, time_delta=time_delta, max_quota=max_quota, context=context))
+
+    def yield_old_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 2, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> AsyncIterator[List[Video]]:
+        return self._iterate(self.sync.yield_old_videos(niche, language, region, num_videos=num_videos, time_delta=time_delta, max_quota=max_quota, context=context))
+
+    def yield_comments(self, video_id: str, query: Optional[str] = None, num_comments: int = 100, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> AsyncIterator[List[Comment]]:
+        return self._iterate(self.sync.yield_comments(video_id, query=query, num_comments=num_comments, max_quota=max_quota, context=context))
@@ -7,18 +7,39 @@
 # Authors:
 # - Scott Jones <scott.jones9336@gmail.com>
 # -----------------------------------------------------------------------------------------------------
-from typing import List, Optional
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
 
 from PySide6 import QtCore
 from pyyoutube import Channel, Comment, Video
 
 from ytapi.pyside import typed_signal
-from ytapi.youtube_api import YouTubeAPI
+from ytapi.cancellation import CancelToken, SearchCancelled
+from ytapi.data_api_search import SCRAPE_SEARCH
+from ytapi.field_masks import VIDEO_CHANNEL_MASK
+from ytapi.quota import QuotaBudgetExceeded, QuotaLedger
+from ytapi.response_cache import default_response_cache
+from ytapi.request_context import RequestContext
+from ytapi.result_delta import DeltaTracker, ResultDelta
+from ytapi.youtube_api import ChannelActivity, YouTubeAPI
+
+
+# Kinds of search a Backend runs, one per tab.
+VIDEOS_SEARCH = "videos"
+CHANNELS_SEARCH = "channels"
+COMMENTS_SEARCH = "comments"
+
+
+class SearchJob(NamedTuple):
+    kind: str
+    # The arguments of the matching search* method (searchVideos, searchChannel or searchComments).
+    args: tuple
+    cancelToken: CancelToken
 
 
 class Backend(QtCore.QObject):
+    # Results are sent as ResultDeltas: (Video, Optional[Channel]) pairs for videos, Channels and Comments.
     @typed_signal.TypedSignal
-    def searchVideosResults(self, videos: List[Video], channels: List[Channel]):
+    def searchVideosResults(self, delta: ResultDelta):
         ...
     
     @typed_signal.TypedSignal
@@ -26,7 +47,7 @@ class Backend(QtCore.QObject):
         ...
     
     @typed_signal.TypedSignal
-    def searchChannelResults(self, channels: List[Channel]):
+    def searchChannelResults(self, delta: ResultDelta):
         ...
     
     @typed_signal.TypedSignal
@@ -34,54 +55,165 @@ class Backend(QtCore.QObject):
         ...
 
     @typed_signal.TypedSignal
-    def searchCommentsResults(self, comments: List[Comment]):
+    def searchCommentsResults(self, delta: ResultDelta):
         ...
     
     @typed_signal.TypedSignal
     def searchCommentsComplete(self):
         ...
 
+    @typed_signal.TypedSignal
+    def searchJobRequested(self, job: SearchJob):
+        ...
+
+    @typed_signal.TypedSignal
+    def searchJobFinished(self):
+        ...
+
     def __init__(self, parent: Optional[QtCore.QObject]) -> None:
         super().__init__(parent=parent)
+        # Queued, so runSearch can be called from any thread and the search runs on this backend's thread.
+        self.searchJobRequested.connect(self.onSearchJobRequested, QtCore.Qt.QueuedConnection)
+        # Token of the job being run; searches started straight through the slots cannot be cancelled.
+        self._cancelToken: CancelToken = CancelToken()
+
+    def runSearch(self, job: SearchJob) -> None:
+        self.searchJobRequested.emit(job)
+
+    @typed_signal.TypedSlot
+    def onSearchJobRequested(self, job: SearchJob) -> None:
+        self._cancelToken = job.cancelToken
+        try:
+            job.cancelToken.raise_if_cancelled()
+            if job.kind == VIDEOS_SEARCH:
+                self.searchVideos(*job.args)
+            elif job.kind == CHANNELS_SEARCH:
+                self.searchChannel(*job.args)
+            elif job.kind == COMMENTS_SEARCH:
+                self.searchComments(*job.args)
+        except SearchCancelled:
+            # Whoever cancelled the search has already moved its tab on, so it gets no completion.
+            pass
+        except Exception as err:
+            print(f"{job.kind} search failed: {err}")
+            self._completeSignal(job.kind).emit()
+        finally:
+            self._cancelToken = CancelToken()
+            self.searchJobFinished.emit()
+
+    def _completeSignal(self, kind: str) -> typed_signal.SelfOnlySignalType:
+        if kind == VIDEOS_SEARCH:
+            return self.searchVideosComplete
+        elif kind == CHANNELS_SEARCH:
+            return self.searchChannelComplete
+        return self.searchCommentsComplete
 
     def getYouTubeAPI(self, key: str) -> YouTubeAPI:
-        return YouTubeAPI(key)
+        searchBackend=str(QtCore.QSettings().value("searchBackend", SCRAPE_SEARCH))
+        return YouTubeAPI(key, response_cache=default_response_cache(), search_backend=searchBackend)
+
+    def getMaxQuota(self) -> Optional[int]:
+        # 0, the default, leaves searches unbudgeted.
+        maxQuota=int(QtCore.QSettings().value("maxQuotaPerSearch", 0))
+        return maxQuota if maxQuota > 0 else None
+
+    def newLedger(self) -> QuotaLedger:
+        # One per search: the search itself, the channels of the video table and the view sorting all charge it.
+        return QuotaLedger(self.getMaxQuota())
+
+    def _reportQuotaUsed(self, kind: str, ledger: QuotaLedger) -> None:
+        endpoints=", ".join(f"{usage.endpoint}: {usage.units}" for usage in ledger.usage())
+        print(f"The {kind} search used {ledger.total} quota units" + (f" ({endpoints})" if endpoints else ""))
+
+    def _updateChannelMemo(self, api: YouTubeAPI, context: RequestContext, channel_memo: Dict[str, Optional[Channel]], channel_ids: Iterable[Optional[str]]) -> None:
+        new_ids=[channel_id for channel_id in dict.fromkeys(channel_ids) if channel_id and channel_id not in channel_memo]
+        if not new_ids:
+            return
+        channels_by_id=api.get_channels_by_ids(new_ids, context=context, mask=VIDEO_CHANNEL_MASK)
+        for channel_id in new_ids:
+            # Remember misses too, so a deleted channel is not requested again on every yield.
+            channel_memo[channel_id]=channels_by_id.get(channel_id)
 
     @typed_signal.TypedSlot
     def onSearchVideosRequested(self, key: str, searchType: str, niche: str, num_videos: int, time_delta: int, language: str, region: str):
+        self.searchVideos(key, searchType, niche, num_videos, time_delta, language, region)
+
+    @typed_signal.TypedSlot
+    def onSearchChannelRequested(self, key: str, searchType: str, niche: str, num_channels: int, time_delta: int, min_subs: int, max_subs: int):
+        self.searchChannel(key, searchType, niche, num_channels, time_delta, min_subs, max_subs)
+
+    @typed_signal.TypedSlot
+    def onSearchCommentsRequested(self, key: str, video_id: str, keywords: str, num_comments: int):
+        self.searchComments(key, video_id, keywords, num_comments)
+
+    def searchVideos(self, key: str, searchType: str, niche: str, num_videos: int, time_delta: int, language: str, region: str) -> None:
         api=self.getYouTubeAPI(key)
+        ledger=self.newLedger()
+        context=api.request_context(language, region, self._cancelToken, ledger=ledger)
         if searchType == "Most Viewed":
-            videos_gen=api.yield_most_viewed_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta)
+            videos_gen=api.yield_most_viewed_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta, context=context)
         elif searchType == "Recycled":
-            videos_gen=api.yield_old_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta)
+            videos_gen=api.yield_old_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta, context=context)
         elif searchType == "Most Pushed":
-            videos_gen=api.yield_pushed_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta)
+            videos_gen=api.yield_pushed_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta, context=context)
         elif searchType == "Less than 4":
-            videos_gen=api.yield_small_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta)
+            videos_gen=api.yield_small_videos(niche=niche, language=language, region=region, num_videos=num_videos, time_delta=time_delta, context=context)
+        # Channels already fetched during this search, so each partial result only fetches new channels.
+        channel_memo: Dict[str, Optional[Channel]]={}
+        deltas: DeltaTracker[Tuple[Video, Optional[Channel]]]=DeltaTracker(lambda pair: pair[0].id)
         for videos in videos_gen:
-            channels=[api.get_channel_info_by_id(video.snippet.channelId) for video in videos]
-            self.searchVideosResults.emit(videos, channels)
+            outOfBudget=False
+            try:
+                self._updateChannelMemo(api, context, channel_memo, (video.snippet.channelId for video in videos))
+            except QuotaBudgetExceeded as err:
+                # The videos are still shown, without the channels there was no budget left for.
+                print(err)
+                outOfBudget=True
+            delta=deltas.diff([(video, channel_memo.get(video.snippet.channelId) if video.snippet.channelId else None) for video in videos])
+            if delta:
+                self.searchVideosResults.emit(delta)
+            if outOfBudget:
+                break
+        self._reportQuotaUsed(VIDEOS_SEARCH, ledger)
         self.searchVideosComplete.emit()
 
 
-    @typed_signal.TypedSlot
-    def onSearchChannelRequested(self, key: str, searchType: str, niche: str, num_channels: int, time_delta: int, min_subs: int, max_subs: int):
+    def searchChannel(self, key: str, searchType: str, niche: str, num_channels: int, time_delta: int, min_subs: int, max_subs: int) -> None:
         api=self.getYouTubeAPI(key)
-        channels_gen=api.yield_small_channels(niche=niche, num_channels=num_channels, time_delta=time_delta, subscriber_range=(min_subs, max_subs))
+        ledger=self.newLedger()
+        context=api.request_context(cancel_token=self._cancelToken, ledger=ledger)
+        # Filled in by the activity filter, so sorting by views never fetches a channel's uploads again.
+        activities: Dict[str, ChannelActivity]={}
+        channels_gen=api.yield_small_channels(niche=niche, num_channels=num_channels, time_delta=time_delta, subscriber_range=(min_subs, max_subs), activities=activities, context=context)
+        deltas: DeltaTracker[Channel]=DeltaTracker(lambda channel: channel.id)
         for channels in channels_gen:
             if searchType == "Sort by Subs":
-                self.searchChannelResults.emit(api.sort_by_subscribers(channels))
+                delta=deltas.diff(api.sort_by_subscribers(channels))
             elif searchType == "Sort by Views":
-                self.searchChannelResults.emit(api.sort_by_recent_views(channels, time_delta))
+                try:
+                    delta=deltas.diff(api.sort_by_recent_views(channels, time_delta, activities, context=context))
+                except QuotaBudgetExceeded as err:
+                    # Out of budget for the views of the new channels: the ones shown so far stay.
+                    print(err)
+                    break
+            else:
+                delta=None
+            if delta:
+                self.searchChannelResults.emit(delta)
+        self._reportQuotaUsed(CHANNELS_SEARCH, ledger)
         self.searchChannelComplete.emit()
         
 
-    @typed_signal.TypedSlot
-    def onSearchCommentsRequested(self, key: str, video_id: str, keywords: str, num_comments: int):
+    def searchComments(self, key: str, video_id: str, keywords: str, num_comments: int) -> None:
         api=self.getYouTubeAPI(key)
-        comments_gen=api.yield_comments(video_id, keywords, num_comments)
+        ledger=self.newLedger()
+        comments_gen=api.yield_comments(video_id, keywords, num_comments, context=api.request_context(cancel_token=self._cancelToken, ledger=ledger))
+        deltas: DeltaTracker[Comment]=DeltaTracker(lambda comment: comment.id)
         for comments in comments_gen:
-            self.searchCommentsResults.emit(comments)
+            delta=deltas.diff(comments)
+            if delta:
+                self.searchCommentsResults.emit(delta)
             if len(comments)>=num_comments:
                 break
+        self._reportQuotaUsed(COMMENTS_SEARCH, ledger)
         self.searchCommentsComplete.emit()
\ No newline at end of file
@@ -0,0 +1,44 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import threading
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """
+    Cooperative cancellation for one search. cancel() may be called from any thread; the search notices
+    the next time it checks, which YouTubeAPI does before and after every network call and while it
+    waits on a lookup another search started. A request already sent is not interrupted: it completes
+    and its result is dropped.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise SearchCancelled()
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Waits up to seconds, raising SearchCancelled as soon as the search is cancelled.
+        """
+        if self._event.wait(seconds):
+            raise SearchCancelled()
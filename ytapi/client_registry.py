@@ -0,0 +1,82 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import threading
+from typing import Dict, Optional, Tuple
+
+from pyyoutube import Api
+from requests.adapters import HTTPAdapter
+
+# Connections kept alive per API key; enough for every lookup worker of every running search.
+DEFAULT_POOL_SIZE = 16
+# (connect, read) timeouts in seconds for each Data API request.
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)
+
+
+class ClientRegistry:
+    """
+    One long-lived pyyoutube Api per API key, so every search made with a key reuses the same
+    keep-alive connections instead of paying a new TCP and TLS handshake. requests already asks for
+    gzip responses and decompresses them.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout: Tuple[float, float] = DEFAULT_TIMEOUT) -> None:
+        self._lock = threading.Lock()
+        self._apis: Dict[str, Api] = {}
+        self.pool_size: int = pool_size
+        self.timeout: Tuple[float, float] = timeout
+
+    def api(self, api_key: str) -> Api:
+        with self._lock:
+            api = self._apis.get(api_key)
+            if api is None:
+                api = Api(api_key=api_key, timeout=self.timeout)
+                self._setup_session(api)
+                self._apis[api_key] = api
+            return api
+
+    def configure(self, pool_size: Optional[int] = None, timeout: Optional[Tuple[float, float]] = None) -> None:
+        """
+        Changes the settings of every client, including those already handed out.
+        """
+        with self._lock:
+            if pool_size is not None:
+                self.pool_size = pool_size
+            if timeout is not None:
+                self.timeout = timeout
+            for api in self._apis.values():
+                self._setup_session(api)
+
+    def ensure_pool_size(self, pool_size: int) -> None:
+        """
+        Grows the connection pools to at least pool_size; never shrinks them.
+        """
+        if pool_size > self.pool_size:
+            self.configure(pool_size=pool_size)
+
+    def close(self) -> None:
+        with self._lock:
+            for api in self._apis.values():
+                api.session.close()
+            self._apis.clear()
+
+    def _setup_session(self, api: Api) -> None:
+        # pyyoutube passes its own timeout to every request.
+        api._timeout = self.timeout
+        adapter = api.session.adapters.get("https://")
+        if isinstance(adapter, HTTPAdapter) and getattr(adapter, "_pool_maxsize", None) == self.pool_size:
+            return
+        api.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size))
+        if adapter is not None:
+            # Its idle connections are dropped now, those in use as their requests finish.
+            adapter.close()
+
+
+# The process-wide registry used by YouTubeAPI unless it is given another.
+client_registry = ClientRegistry()
@@ -0,0 +1,80 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+
+# A mapper runs fn over every item and returns the results in item order.
+# YouTubeAPI sends all of its independent lookups through one, so callers choose how they run.
+Mapper = Callable[[Callable[[Any], Any], Sequence[Any]], List[Any]]
+
+
+def sequential_map(fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+    return [fn(item) for item in items]
+
+
+DEFAULT_MAX_WORKERS = 8
+
+# Set on threads running a fanned out lookup, so lookups nested inside it run inline
+# instead of waiting on workers held by their own parents.
+_task_state = threading.local()
+
+
+def in_mapped_task() -> bool:
+    return bool(getattr(_task_state, "active", False))
+
+
+def run_as_mapped_task(fn: Callable[[Any], Any], item: Any) -> Any:
+    _task_state.active = True
+    try:
+        return fn(item)
+    finally:
+        _task_state.active = False
+
+
+class ThreadPoolMapper:
+    """
+    Runs the lookups on a bounded pool of worker threads, so at most max_workers requests are in flight.
+    Results keep item order. If a lookup raises, the lookups not yet started are cancelled and the error is re-raised.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        self.max_workers: int = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ytapi-lookup")
+
+    def __call__(self, fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        if len(items) < 2 or in_mapped_task():
+            return sequential_map(fn, items)
+        futures: List[Future] = [self._executor.submit(run_as_mapped_task, fn, item) for item in items]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_default_mapper: Optional[ThreadPoolMapper] = None
+_default_mapper_lock = threading.Lock()
+
+
+def default_mapper() -> ThreadPoolMapper:
+    """
+    The worker pool shared by every YouTubeAPI in the process that is not given its own mapper.
+    """
+    global _default_mapper
+    with _default_mapper_lock:
+        if _default_mapper is None:
+            _default_mapper = ThreadPoolMapper()
+        return _default_mapper
+
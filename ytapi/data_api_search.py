@@ -0,0 +1,93 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import datetime
+from typing import Any, Callable, Dict, Optional
+
+# Search backends YouTubeAPI can use for the video search modes.
+SCRAPE_SEARCH = "scrape"
+DATA_API_SEARCH = "data_api"
+
+SEARCH_PAGE_SIZE = 50
+# Only the video ids and the next page token are read from a search response.
+SEARCH_FIELDS = "nextPageToken,items(id(videoId))"
+
+
+def days_ago_cutoff(time_delta: int) -> str:
+    """
+    The earliest publish time YouTubeAPI._isRecent accepts for a time delta in days, as an RFC 3339 timestamp.
+    Both count days in UTC, as publishedAt does.
+    """
+    day = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=time_delta - 1)
+    return f"{day.isoformat()}T00:00:00Z"
+
+
+def years_ago_cutoff(time_delta: int) -> str:
+    """
+    The latest publish time YouTubeAPI._isOldVideo accepts for a time delta in years, as an RFC 3339 timestamp.
+    """
+    day = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=int(time_delta*365))
+    return f"{day.isoformat()}T00:00:00Z"
+
+
+class DataAPISearch:
+    """
+    A video search run through the Data API search.list endpoint, with the same result()/next() interface
+    as the youtubesearchpython searches. Filters such as publishedAfter, videoDuration and order are applied
+    by YouTube, so results a search mode would throw away are never downloaded or hydrated.
+    Each page costs 100 quota units, against nothing for the scraped searches.
+    """
+
+    def __init__(
+        self,
+        call: Callable[..., dict],
+        query: str,
+        language: str,
+        region: str,
+        order: str = "date",
+        published_after: Optional[str] = None,
+        published_before: Optional[str] = None,
+        video_duration: Optional[str] = None,
+    ) -> None:
+        self._call = call
+        self._params: Dict[str, Any] = {
+            "part": "id",
+            "fields": SEARCH_FIELDS,
+            "type": "video",
+            "q": query,
+            "order": order,
+            "maxResults": SEARCH_PAGE_SIZE,
+            "relevanceLanguage": language,
+            "regionCode": region,
+        }
+        if published_after:
+            self._params["publishedAfter"] = published_after
+        if published_before:
+            self._params["publishedBefore"] = published_before
+        if video_duration:
+            self._params["videoDuration"] = video_duration
+        self._response: dict = {}
+        self._fetch(None)
+
+    def _fetch(self, page_token: Optional[str]) -> None:
+        params = dict(self._params)
+        if page_token:
+            params["pageToken"] = page_token
+        self._response = self._call("search", **params)
+
+    def result(self) -> dict:
+        video_ids = [item["id"]["videoId"] for item in self._response.get("items", []) if item.get("id", {}).get("videoId")]
+        return {"result": [{"id": video_id} for video_id in video_ids]}
+
+    def next(self) -> bool:
+        page_token = self._response.get("nextPageToken")
+        if not page_token:
+            raise Exception("No more search results.")
+        self._fetch(page_token)
+        return True
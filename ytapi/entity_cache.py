@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Iterable, NamedTuple, Optional, Tuple, TypeVar
+
+from pyyoutube import Channel, Comment, Video
+
+T = TypeVar("T")
+
+# Seconds an entity stays fresh, and how many of them are kept, per entity type.
+DEFAULT_VIDEO_TTL = 30 * 60
+DEFAULT_CHANNEL_TTL = 6 * 60 * 60
+DEFAULT_COMMENT_TTL = 30 * 60
+DEFAULT_MAX_ENTRIES = 20000
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class EntityCache(Generic[T]):
+    """
+    Thread-safe LRU cache of API entities keyed by id, where every entry expires after ttl seconds.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        self.ttl: float = ttl
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def configure(self, ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+                self._evict()
+
+    def get(self, key: str) -> Optional[T]:
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, T]:
+        found: Dict[str, T] = {}
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                value = self._get(key, now)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def put(self, key: str, value: T) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, values: Dict[str, T]) -> None:
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._entries))
+
+    def _get(self, key: str, now: float) -> Optional[T]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+class EntityCaches:
+    def __init__(self) -> None:
+        self.videos: EntityCache[Video] = EntityCache(DEFAULT_VIDEO_TTL)
+        self.channels: EntityCache[Channel] = EntityCache(DEFAULT_CHANNEL_TTL)
+        self.comments: EntityCache[Comment] = EntityCache(DEFAULT_COMMENT_TTL)
+
+    def clear(self) -> None:
+        self.videos.clear()
+        self.channels.clear()
+        self.comments.clear()
+
+
+# Shared by every YouTubeAPI in the process unless one is given its own caches.
+entity_caches = EntityCaches()
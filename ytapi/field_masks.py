@@ -0,0 +1,64 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+# The fields StoredYoutubeData reads for each exported (and displayed) column; keep them in step with it.
+VIDEO_EXPORT_FIELDS = ("id", "snippet.title", "snippet.channelTitle", "snippet.channelId", "snippet.publishedAt", "statistics.viewCount", "statistics.likeCount", "statistics.commentCount", "contentDetails.duration")
+# The channel columns of the video table.
+VIDEO_CHANNEL_EXPORT_FIELDS = ("id", "statistics.subscriberCount", "statistics.videoCount", "snippet.country")
+CHANNEL_EXPORT_FIELDS = ("id", "snippet.title", "snippet.country", "statistics.subscriberCount", "statistics.viewCount", "statistics.videoCount")
+COMMENT_EXPORT_FIELDS = ("id", "snippet.authorDisplayName", "snippet.textDisplay", "snippet.likeCount", "snippet.viewerRating")
+
+
+class FieldMask(NamedTuple):
+    """
+    The part and fields parameters of a list request, so YouTube only sends what is read.
+    name tells masks apart in cache keys.
+    """
+    name: str
+    part: str
+    fields: str
+
+
+def _nest(paths: Iterable[str]) -> Dict[str, dict]:
+    tree: Dict[str, dict] = {}
+    for path in paths:
+        node = tree
+        for key in path.split("."):
+            node = node.setdefault(key, {})
+    return tree
+
+
+def _fields(tree: Dict[str, dict]) -> str:
+    return ",".join(f"{key}({_fields(subtree)})" if subtree else key for key, subtree in tree.items())
+
+
+def field_mask(name: str, paths: Iterable[str], page_fields: Tuple[str, ...] = ()) -> FieldMask:
+    """
+    The mask fetching the dotted attribute paths of each item, such as "statistics.viewCount".
+    page_fields are response level fields to keep as well, such as nextPageToken.
+    """
+    tree = _nest(paths)
+    tree.setdefault("id", {})
+    part = ",".join(dict.fromkeys(key for key in tree))
+    return FieldMask(name, part, ",".join(page_fields + (f"items({_fields(tree)})",)))
+
+
+# Every video mode shows the exported columns; the modes themselves only read fields among them
+# (snippet.publishedAt, snippet.channelId, statistics.viewCount and contentDetails.duration).
+VIDEO_MASK = field_mask("video", VIDEO_EXPORT_FIELDS)
+# Summing the recent views of a channel's uploads.
+VIDEO_VIEWS_MASK = field_mask("video_views", ("statistics.viewCount",))
+# The channels of the video table, also used to score Most Pushed.
+VIDEO_CHANNEL_MASK = field_mask("video_channel", VIDEO_CHANNEL_EXPORT_FIELDS)
+# The channel search also scans each channel's uploads playlist.
+CHANNEL_MASK = field_mask("channel", CHANNEL_EXPORT_FIELDS + ("contentDetails.relatedPlaylists.uploads",))
+UPLOADS_MASK = field_mask("uploads", ("contentDetails.videoId", "contentDetails.videoPublishedAt"), page_fields=("nextPageToken",))
+COMMENT_MASK = field_mask("comment", COMMENT_EXPORT_FIELDS)
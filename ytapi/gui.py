@@ -8,13 +8,17 @@
 # - Scott Jones <scott.jones9336@gmail.com>
 # -----------------------------------------------------------------------------------------------------
 from pathlib import Path
-from typing import Optional, Sequence, List
+from typing import Dict, Optional, List, Tuple
 from PySide6 import QtCore
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QComboBox, QPushButton, QTableWidget, QLineEdit, QSpinBox, QTableWidgetItem
+from PySide6.QtWidgets import QComboBox, QLabel, QPushButton, QTableView, QLineEdit, QSpinBox
+from ytapi.backend import CHANNELS_SEARCH, COMMENTS_SEARCH, VIDEOS_SEARCH
 from ytapi.pyside import makeUiClass, typed_signal
+from ytapi.result_delta import ResultDelta
+from ytapi.quota import quota_tracker, split_api_keys
+from ytapi.result_model import ResultTableModel, addCommas
 from ytapi.save_to_csv import StoredYoutubeData
-from pyyoutube import Channel, Video, Comment
+from pyyoutube import Channel, Video
+QUOTA_REFRESH_MS = 1000
 # Define classes from ui templates
 UI_DIR = Path(__file__).resolve().parent
 MainWindowUi = makeUiClass(UI_DIR / "gui.ui")
@@ -32,14 +36,20 @@ class MainWindow(MainWindowUi): # type: ignore
     def searchCommentsRequested(self, key: str, video_id: str, keywords: str, num_comments: int):
         ...
 
+    @typed_signal.TypedSignal
+    def searchStopRequested(self, kind: str):
+        ...
+
     lineEdit_APIKEY: "QLineEdit"
+    label_quotaUsage: "QLabel"
     comboBox_searchTypeVideo: "QComboBox"
     lineEdit_nicheVideo: "QLineEdit"
     spinBox_numVideos: "QSpinBox"
     spinBox_timeDeltaVideos: "QSpinBox"
     lineEdit_languageRegion: "QLineEdit"
     pushButton_searchVideos: "QPushButton"
-    tableWidget_videos: "QTableWidget"                                        
+    pushButton_stopVideos: "QPushButton"
+    tableView_videos: "QTableView"
     pushButton_exportVideos: "QPushButton"
     comboBox_sortTypeChannel: "QComboBox"
     lineEdit_nicheChannel: "QLineEdit"
@@ -48,12 +58,14 @@ class MainWindow(MainWindowUi): # type: ignore
     spinBox_maxSubs: "QSpinBox"
     spinBox_timeDeltaChannel: "QSpinBox"
     pushButton_searchChannel: "QPushButton"
-    tableWidget_channel: "QTableWidget"
+    pushButton_stopChannel: "QPushButton"
+    tableView_channel: "QTableView"
     pushButton_exportChannel: "QPushButton"
     lineEdit_videoID: "QLineEdit"
     lineEdit_keywords: "QLineEdit"
     pushButton_searchComments: "QPushButton"
-    tableWidget_comments: "QTableWidget"
+    pushButton_stopComments: "QPushButton"
+    tableView_comments: "QTableView"
     pushButton_exportComments: "QPushButton"
     spinBox_comments: "QSpinBox"
 
@@ -73,14 +85,28 @@ class MainWindow(MainWindowUi): # type: ignore
         else:
             self.lineEdit_APIKEY.setFocus()
 
-        self.currentVideos: List[Video] = []
-        self.currentChannels: List[Channel] = []
-        self.currentComments: List[Comment] = []
+        # Video rows are (Video, Optional[Channel]) pairs.
+        self.videoResults = ResultTableModel(lambda pair: pair[0].id, self._videosDict, self)
+        self.channelResults = ResultTableModel(lambda channel: channel.id, StoredYoutubeData().get_channels_dict, self)
+        self.commentResults = ResultTableModel(lambda comment: comment.id, StoredYoutubeData().get_comments_dict, self)
+        self.tableView_videos.setModel(self.videoResults)
+        self.tableView_channel.setModel(self.channelResults)
+        self.tableView_comments.setModel(self.commentResults)
+
+        # Several keys can be entered, separated by commas; their estimated quota use is shown under them.
+        self.lineEdit_APIKEY.setToolTip("API keys, separated by commas")
+        self.quotaTimer = QtCore.QTimer(self)
+        self.quotaTimer.timeout.connect(self.onQuotaUsageChanged)
+        self.quotaTimer.start(QUOTA_REFRESH_MS)
+        self._showQuotaUsage()
 
     def _connectSignals(self) -> None:
         self.pushButton_searchVideos.clicked.connect(self.onSearchVideos)
         self.pushButton_searchChannel.clicked.connect(self.onSearchChannel)
         self.pushButton_searchComments.clicked.connect(self.onSearchComments)
+        self.pushButton_stopVideos.clicked.connect(self.onStopVideos)
+        self.pushButton_stopChannel.clicked.connect(self.onStopChannel)
+        self.pushButton_stopComments.clicked.connect(self.onStopComments)
         self.pushButton_exportVideos.clicked.connect(self.onExportVideos)
         self.pushButton_exportChannel.clicked.connect(self.onExportChannel)
         self.pushButton_exportComments.clicked.connect(self.onExportComments)
@@ -91,14 +117,10 @@ class MainWindow(MainWindowUi): # type: ignore
 
     def _setEnabled(self, enabled: bool) -> None:
         self.setEnabled(enabled)
-        
-    def _addCommas(self, value: str) -> str:
-        splitValue = ""
-        for i, char in enumerate(value):
-            splitValue+=char
-            if (len(value)-(i+1)) % 3 == 0 and i != len(value)-1:
-                splitValue+=","
-        return splitValue
+
+
+    def _videosDict(self, pairs: List[Tuple[Video, Optional[Channel]]]) -> Dict[str, list]:
+        return StoredYoutubeData().get_videos_dict([video for video, _ in pairs], [channel for _, channel in pairs])
 
     @typed_signal.TypedSlot
     def onAPIKeyChanged(self) -> None:
@@ -122,7 +144,8 @@ class MainWindow(MainWindowUi): # type: ignore
 
     @typed_signal.TypedSlot
     def onSearchVideos(self) -> None:
-        self.pushButton_searchVideos.setEnabled(False)
+        # Left enabled: searching again replaces the running search.
+        self.pushButton_stopVideos.setEnabled(True)
         self.pushButton_exportVideos.setEnabled(False)
         self.pushButton_searchVideos.setText("loading...")
         niche = self.lineEdit_nicheVideo.text()
@@ -134,32 +157,30 @@ class MainWindow(MainWindowUi): # type: ignore
 
 
     @typed_signal.TypedSlot
-    def onSearchVideosResults(self, videos: List[Video], channels: List[Channel]) -> None:
-        self.currentVideos=videos
-        video_dict = StoredYoutubeData().get_videos_dict(self.currentVideos, channels)
-        self.tableWidget_videos.clear()
-        for colIdx, (columnName, columnData) in enumerate(video_dict.items()):
-            self.tableWidget_videos.insertColumn(self.tableWidget_videos.columnCount())
-            for rowIdx, itemData in enumerate(columnData):
-                if colIdx==0:
-                    self.tableWidget_videos.insertRow(self.tableWidget_videos.rowCount())
-                item = QTableWidgetItem()
-                item.setData(Qt.DisplayRole, self._addCommas(str(itemData)) if str(itemData).isnumeric() else itemData)
-                self.tableWidget_videos.setItem(rowIdx, colIdx, item)
-        labels: Sequence[str] = [label for label in video_dict.keys()]
-        self.tableWidget_videos.setHorizontalHeaderLabels(labels)
+    def onSearchVideosResults(self, delta: ResultDelta) -> None:
+        self.videoResults.applyDelta(delta)
 
     @typed_signal.TypedSlot
     def onSearchVideosComplete(self) -> None:
+        self._finishVideosSearch()
+
+    def _finishVideosSearch(self) -> None:
         self.pushButton_searchVideos.setText("search")
         self.pushButton_searchVideos.setEnabled(True)
+        self.pushButton_stopVideos.setEnabled(False)
         self.pushButton_exportVideos.setEnabled(True)
+
+    @typed_signal.TypedSlot
+    def onStopVideos(self) -> None:
+        # A cancelled search sends no completion, the results so far stay in the table.
+        self.searchStopRequested.emit(VIDEOS_SEARCH)
+        self._finishVideosSearch()
             
 
     @typed_signal.TypedSlot
     def onSearchChannel(self) -> None:
         self.pushButton_searchChannel.setText("loading...")
-        self.pushButton_searchChannel.setEnabled(False)
+        self.pushButton_stopChannel.setEnabled(True)
         self.pushButton_exportChannel.setEnabled(False)
         niche = self.lineEdit_nicheChannel.text()
         num_channels = self.spinBox_numChannels.value()
@@ -169,33 +190,30 @@ class MainWindow(MainWindowUi): # type: ignore
         self.searchChannelRequested.emit(self.apiKey, searchType, niche, num_channels, time_delta, min_subs, max_subs)
 
     @typed_signal.TypedSlot
-    def onSearchChannelResults(self, channels: List[Channel]) -> None:
-        self.currentChannels=channels
-        channel_dict = StoredYoutubeData().get_channels_dict(self.currentChannels)
-        self.tableWidget_channel.clear()
-        for colIdx, (columnName, columnData) in enumerate(channel_dict.items()):
-            self.tableWidget_channel.insertColumn(self.tableWidget_channel.columnCount())
-            for rowIdx, itemData in enumerate(columnData):
-                if colIdx == 0:
-                    self.tableWidget_channel.insertRow(self.tableWidget_channel.rowCount())
-                item = QTableWidgetItem()
-                item.setData(Qt.DisplayRole, self._addCommas(str(itemData)) if str(itemData).isnumeric() else itemData)
-                self.tableWidget_channel.setItem(rowIdx, colIdx, item)
-        labels: Sequence[str] = [label for label in channel_dict.keys()]
-        self.tableWidget_channel.setHorizontalHeaderLabels(labels)
+    def onSearchChannelResults(self, delta: ResultDelta) -> None:
+        self.channelResults.applyDelta(delta)
         
 
     @typed_signal.TypedSlot
     def onSearchChannelComplete(self) -> None:
+        self._finishChannelSearch()
+
+    def _finishChannelSearch(self) -> None:
         self.pushButton_searchChannel.setText("search")
         self.pushButton_searchChannel.setEnabled(True)
+        self.pushButton_stopChannel.setEnabled(False)
         self.pushButton_exportChannel.setEnabled(True)
 
+    @typed_signal.TypedSlot
+    def onStopChannel(self) -> None:
+        self.searchStopRequested.emit(CHANNELS_SEARCH)
+        self._finishChannelSearch()
+
     
     @typed_signal.TypedSlot
     def onSearchComments(self) -> None:
         self.pushButton_searchComments.setText("loading...")
-        self.pushButton_searchComments.setEnabled(False)
+        self.pushButton_stopComments.setEnabled(True)
         self.pushButton_exportComments.setEnabled(False)
         video_id = self.lineEdit_videoID.text()
         keywords = self.lineEdit_keywords.text()
@@ -203,38 +221,52 @@ class MainWindow(MainWindowUi): # type: ignore
         self.searchCommentsRequested.emit(self.apiKey, video_id, keywords, num_comments)
 
     @typed_signal.TypedSlot
-    def onSearchCommentsResults(self, comments: List[Comment]) -> None:
-        self.currentComments=comments
-        comments_dict = StoredYoutubeData().get_comments_dict(self.currentComments)
-        self.tableWidget_comments.clear()
-        for colIdx, (columnName, columnData) in enumerate(comments_dict.items()):
-            self.tableWidget_comments.insertColumn(self.tableWidget_comments.columnCount())
-            for rowIdx, itemData in enumerate(columnData):
-                if colIdx == 0:
-                    self.tableWidget_comments.insertRow(self.tableWidget_comments.rowCount())
-                item = QTableWidgetItem()
-                item.setData(Qt.DisplayRole, self._addCommas(str(itemData)) if str(itemData).isnumeric() else itemData)
-                self.tableWidget_comments.setItem(rowIdx, colIdx, item)
-        labels: Sequence[str] = [label for label in comments_dict.keys()]
-        self.tableWidget_comments.setHorizontalHeaderLabels(labels)
+    def onSearchCommentsResults(self, delta: ResultDelta) -> None:
+        self.commentResults.applyDelta(delta)
     
     @typed_signal.TypedSlot
     def onSearchCommentsComplete(self) -> None:
+        self._finishCommentsSearch()
+
+    def _finishCommentsSearch(self) -> None:
         self.pushButton_searchComments.setText("search")
         self.pushButton_searchComments.setEnabled(True)
+        self.pushButton_stopComments.setEnabled(False)
         self.pushButton_exportComments.setEnabled(True)
 
+    @typed_signal.TypedSlot
+    def onStopComments(self) -> None:
+        self.searchStopRequested.emit(COMMENTS_SEARCH)
+        self._finishCommentsSearch()
+
+    @typed_signal.TypedSlot
+    def onQuotaUsageChanged(self) -> None:
+        self._showQuotaUsage()
+
+    def _showQuotaUsage(self) -> None:
+        usages = quota_tracker.usage(split_api_keys(self.apiKey))
+        self.label_quotaUsage.setText("    ".join(
+            f"...{usage.api_key[-4:]}: {addCommas(str(usage.units))}/{addCommas(str(quota_tracker.daily_quota))}" + (" (out of quota)" if usage.exhausted else "")
+            for usage in usages
+        ))
+
+    @typed_signal.TypedSlot
+    def onQueueDepthChanged(self, depth: int) -> None:
+        title = self.windowTitle().split(" - ")[0]
+        self.setWindowTitle(f"{title} - {depth} queued" if depth else title)
+
     @typed_signal.TypedSlot
     def onExportVideos(self) -> None:
-        StoredYoutubeData().save_videos_to_file(self.currentVideos, self.currentChannels)
+        videoPairs = self.videoResults.items
+        StoredYoutubeData().save_videos_to_file([video for video, _ in videoPairs], [channel for _, channel in videoPairs])
     
     @typed_signal.TypedSlot
     def onExportChannel(self) -> None:
-        StoredYoutubeData().save_channels_to_file(self.currentChannels)
+        StoredYoutubeData().save_channels_to_file(self.channelResults.items)
 
     @typed_signal.TypedSlot
     def onExportComments(self) -> None:
-        StoredYoutubeData().save_comments_to_file(self.currentComments)
+        StoredYoutubeData().save_comments_to_file(self.commentResults.items)
 
 
     
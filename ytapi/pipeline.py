@@ -0,0 +1,131 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+# Items each stage may run ahead of the next one before it waits.
+DEFAULT_PIPELINE_DEPTH = 1
+# How often a blocked stage checks whether the pipeline was closed, in seconds.
+_POLL_INTERVAL = 0.1
+
+
+class _End:
+    pass
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class Pipeline:
+    """
+    Runs a source and a chain of stages, each on its own thread, connected by bounded queues. While the
+    consumer works on one item, the stages are already producing the next ones; once a queue is full the
+    stage feeding it waits, so no stage gets more than depth items ahead.
+
+    Iterating gives the output of the last stage, in source order. An exception raised in any stage is
+    re-raised to the consumer in place of the item it was working on. Closing the pipeline, which leaving
+    a with block does, stops every stage after the item it is on.
+
+    With threaded=False everything runs in the consumer's thread, one item at a time, for sources that
+    must not run ahead (each Data API search page costs quota).
+    """
+
+    def __init__(self, source: Iterable[Any], stages: Sequence[Callable[[Any], Any]] = (), depth: int = DEFAULT_PIPELINE_DEPTH, threaded: bool = True) -> None:
+        self._stop = threading.Event()
+        self._output: Iterator[Any]
+        if not threaded:
+            self._output = self._inline(source, stages)
+            return
+        upstream: "queue.Queue[Any]" = queue.Queue(maxsize=max(depth, 1))
+        self._start(self._produce, iter(source), upstream)
+        for stage in stages:
+            downstream: "queue.Queue[Any]" = queue.Queue(maxsize=max(depth, 1))
+            self._start(self._transform, stage, upstream, downstream)
+            upstream = downstream
+        self._output = self._consume(upstream)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._output
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+
+    @staticmethod
+    def _inline(source: Iterable[Any], stages: Sequence[Callable[[Any], Any]]) -> Iterator[Any]:
+        for item in source:
+            for stage in stages:
+                item = stage(item)
+            yield item
+
+    def _start(self, target: Callable[..., None], *args: Any) -> None:
+        threading.Thread(target=target, args=args, name="ytapi-pipeline", daemon=True).start()
+
+    def _put(self, out: "queue.Queue[Any]", item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                out.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, inbox: "queue.Queue[Any]") -> Any:
+        while not self._stop.is_set():
+            try:
+                return inbox.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _End()
+
+    def _produce(self, source: Iterator[Any], out: "queue.Queue[Any]") -> None:
+        try:
+            for item in source:
+                if not self._put(out, item):
+                    return
+        except BaseException as err:
+            self._put(out, _Failure(err))
+            return
+        self._put(out, _End())
+
+    def _transform(self, stage: Callable[[Any], Any], inbox: "queue.Queue[Any]", out: "queue.Queue[Any]") -> None:
+        while True:
+            item = self._get(inbox)
+            if isinstance(item, (_End, _Failure)):
+                self._put(out, item)
+                return
+            try:
+                result = stage(item)
+            except BaseException as err:
+                self._put(out, _Failure(err))
+                return
+            if not self._put(out, result):
+                return
+
+    def _consume(self, inbox: "queue.Queue[Any]") -> Iterator[Any]:
+        try:
+            while True:
+                item = self._get(inbox)
+                if isinstance(item, _End):
+                    return
+                elif isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            self.close()
+
@@ -0,0 +1,185 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import argparse
+import datetime
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+# Data API quota units charged per request, by resource. Every list request not named here costs 1.
+QUOTA_COSTS: Dict[str, int] = {
+    "search": 100,
+}
+DEFAULT_QUOTA_COST = 1
+# Units a project gets per day unless Google has granted more.
+DAILY_QUOTA = 10000
+# Quotas reset at midnight Pacific time; daylight saving is ignored.
+QUOTA_DAY_OFFSET = datetime.timedelta(hours=-8)
+# Error reasons meaning the key has no quota left today.
+QUOTA_EXCEEDED_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+def quota_cost(resource: str) -> int:
+    return QUOTA_COSTS.get(resource, DEFAULT_QUOTA_COST)
+
+
+def split_api_keys(api_keys: str) -> List[str]:
+    """
+    The keys in a comma separated list, in order and without duplicates.
+    """
+    return list(dict.fromkeys(api_key.strip() for api_key in api_keys.split(",") if api_key.strip()))
+
+
+def is_quota_exceeded(err: Exception) -> bool:
+    """
+    Whether a PyYouTubeException was raised because the key ran out of quota.
+    """
+    try:
+        errors = getattr(err, "response").json()["error"]["errors"]
+        return any(error.get("reason") in QUOTA_EXCEEDED_REASONS for error in errors)
+    except Exception:
+        return any(reason in str(getattr(err, "message", err)) for reason in QUOTA_EXCEEDED_REASONS)
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+class QuotaBudgetExceeded(Exception):
+    pass
+
+
+class KeyUsage(NamedTuple):
+    api_key: str
+    units: int
+    exhausted: bool
+
+
+class QuotaTracker:
+    """
+    Estimated quota units used today by each API key, shared by every client in the process.
+
+    Units are charged each time a request is sent with a key, so retries and hedges count as well.
+    """
+
+    def __init__(self, daily_quota: int = DAILY_QUOTA) -> None:
+        self.daily_quota: int = daily_quota
+        self._lock = threading.Lock()
+        self._units: Dict[str, int] = {}
+        self._exhausted: Set[str] = set()
+        self._day: datetime.date = self._today()
+
+    @staticmethod
+    def _today() -> datetime.date:
+        return (datetime.datetime.now(datetime.timezone.utc) + QUOTA_DAY_OFFSET).date()
+
+    def _roll_over(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._units.clear()
+            self._exhausted.clear()
+
+    def choose(self, api_keys: Iterable[str], units: int) -> str:
+        """
+        Picks the least used key that still has quota for a request of units. A key is skipped once
+        YouTube has said it is out of quota, or once the estimate says it would go over daily_quota.
+        Raises QuotaExhausted when none is left.
+        """
+        with self._lock:
+            self._roll_over()
+            candidates = [api_key for api_key in api_keys if api_key not in self._exhausted and self._units.get(api_key, 0) + units <= self.daily_quota]
+            if not candidates:
+                raise QuotaExhausted("Every API key has used up its quota for today.")
+            return min(candidates, key=lambda candidate: self._units.get(candidate, 0))
+
+    def charge(self, api_key: str, units: int) -> None:
+        with self._lock:
+            self._roll_over()
+            self._units[api_key] = self._units.get(api_key, 0) + units
+
+    def mark_exhausted(self, api_key: str) -> None:
+        with self._lock:
+            self._roll_over()
+            self._exhausted.add(api_key)
+
+    def usage(self, api_keys: Optional[Iterable[str]] = None) -> List[KeyUsage]:
+        with self._lock:
+            self._roll_over()
+            keys = list(api_keys) if api_keys is not None else list(self._units)
+            return [KeyUsage(api_key, self._units.get(api_key, 0), api_key in self._exhausted) for api_key in keys]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._units.clear()
+            self._exhausted.clear()
+
+
+class EndpointUsage(NamedTuple):
+    endpoint: str
+    requests: int
+    units: int
+
+
+class QuotaLedger:
+    """
+    The quota units one search has spent, per endpoint. Responses served from the cache cost nothing.
+
+    With max_quota set, a request that would take the total over it raises QuotaBudgetExceeded instead of
+    being sent, and the search modes stop there with the results found so far.
+    """
+
+    def __init__(self, max_quota: Optional[int] = None) -> None:
+        self.max_quota: Optional[int] = max_quota
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = {}
+        self._units: Dict[str, int] = {}
+
+    def charge(self, endpoint: str, units: int) -> None:
+        with self._lock:
+            total = sum(self._units.values())
+            if self.max_quota is not None and total + units > self.max_quota:
+                raise QuotaBudgetExceeded(f"A {endpoint} request would take the search over its budget of {self.max_quota} quota units.")
+            self._requests[endpoint] = self._requests.get(endpoint, 0) + 1
+            self._units[endpoint] = self._units.get(endpoint, 0) + units
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._units.values())
+
+    def usage(self) -> List[EndpointUsage]:
+        with self._lock:
+            return [EndpointUsage(endpoint, self._requests[endpoint], units) for endpoint, units in self._units.items()]
+
+
+# The process-wide tracker used by YouTubeAPI unless it is given another.
+quota_tracker = QuotaTracker()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    # Imported here, as youtube_api itself depends on this module.
+    from ytapi.data_api_search import DATA_API_SEARCH, SCRAPE_SEARCH
+    from ytapi.youtube_api import SEARCH_MODES, estimate_quota
+
+    parser = argparse.ArgumentParser(prog="python -m ytapi.quota", description="Estimate the quota a search would spend, without sending anything.")
+    parser.add_argument("mode", choices=SEARCH_MODES)
+    parser.add_argument("num_results", type=int)
+    parser.add_argument("--backend", choices=(SCRAPE_SEARCH, DATA_API_SEARCH), default=SCRAPE_SEARCH, help="Search backend of the video modes.")
+    parser.add_argument("--with-views", action="store_true", help="Channel search sorted by recent views.")
+    args = parser.parse_args(argv)
+
+    units = estimate_quota(args.mode, args.num_results, args.backend, args.with_views)
+    for endpoint, endpoint_units in units.items():
+        print(f"{endpoint:<15} {endpoint_units:>8} units")
+    print(f"{'total':<15} {sum(units.values()):>8} units")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import heapq
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    """
+    Keeps the k items with the highest keys seen so far, in a min-heap of (key, -arrival, item).
+    Adding an item costs O(log k). Items with equal keys rank in arrival order, like a stable sort.
+    The ranked view is cached until an item gets in, so pages that change nothing are not sorted again.
+    """
+
+    def __init__(self, k: int) -> None:
+        self.k: int = k
+        self._heap: List[Tuple[float, int, T]] = []
+        self._arrivals: int = 0
+        self._ranked: Optional[List[T]] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: T, key: float) -> bool:
+        """
+        Returns whether the item made it into the top k.
+        """
+        if self.k <= 0:
+            return False
+        self._arrivals += 1
+        entry = (key, -self._arrivals, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            self._ranked = None
+            return True
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            self._ranked = None
+            return True
+        return False
+
+    def items(self) -> List[T]:
+        """
+        The kept items, highest key first.
+        """
+        if self._ranked is None:
+            self._ranked = [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+        return list(self._ranked)
@@ -0,0 +1,115 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from typing import Any, Dict, List, Optional, Type, Union, cast
+
+from pyyoutube import PyYouTubeException
+from requests import HTTPError, Response
+
+try:
+    # Optional: several times faster than the standard library on API sized responses.
+    import orjson
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+    import json
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+# The Data API sends these counts as strings; the pyyoutube models, and so the code reading them, have ints.
+INT_FIELDS = frozenset(("viewCount", "likeCount", "dislikeCount", "commentCount", "subscriberCount", "videoCount"))
+
+
+def parse_response(response: Response) -> dict:
+    """
+    The json of a Data API response, raising PyYouTubeException on api errors as pyyoutube does.
+    An error status without an api error in the body, such as an HTML 503 page or an empty 429, raises
+    requests.HTTPError, which carries the response and so its status.
+    """
+    try:
+        data: Any = loads(response.content)
+    except ValueError:
+        if response.status_code < 400:
+            raise
+        data = None
+    if not isinstance(data, dict) and response.status_code < 400:
+        # Valid json, but not the object every Data API response is, so as malformed as a body that is not json.
+        raise ValueError(f"Expected a json object from {response.url}, got {type(data).__name__}.")
+    if isinstance(data, dict) and "error" in data:
+        raise PyYouTubeException(response)
+    elif response.status_code >= 400:
+        raise HTTPError(f"{response.status_code} {response.reason} from {response.url}", response=response)
+    return cast(Dict[str, Any], data)
+
+
+class RawEntity:
+    """
+    A read only view of an entity's raw json, with its fields as attributes like the pyyoutube models
+    (video.snippet.publishedAt, video.statistics.viewCount, ...). Fields missing from the json read as None.
+
+    Nothing is parsed beyond the json itself: nested objects are wrapped as they are read, and the full
+    pyyoutube model is only built by to_model(). The counts in INT_FIELDS read as ints, as they do on the
+    models; to_dict() keeps them as sent.
+    """
+
+    __slots__ = ("_data", "_model", "_built")
+
+    def __init__(self, data: Dict[str, Any], model: Optional[Type[Any]] = None) -> None:
+        self._data = data
+        self._model = model
+        self._built: Any = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = self._data.get(name)
+        if name in INT_FIELDS and isinstance(value, str):
+            return int(value)
+        return _wrap(value)
+
+    def __repr__(self) -> str:
+        model_name = self._model.__name__ if self._model is not None else "RawEntity"
+        return f"{model_name}(id={self._data.get('id')!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._data
+
+    def to_model(self) -> Any:
+        """
+        The pyyoutube model for the json, built on first use.
+        """
+        if self._model is None:
+            raise TypeError("Only a top level entity can be converted to its model.")
+        if self._built is None:
+            self._built = self._model.from_dict(self._data)
+        return self._built
+
+
+def _wrap(value: Any) -> Any:
+    if isinstance(value, dict):
+        return RawEntity(value)
+    elif isinstance(value, list):
+        return [_wrap(item) for item in value]
+    return value
+
+
+def items_of(response: dict, model: Type[Any]) -> List[Any]:
+    """
+    The items of a list response, wrapped without building their models.
+    """
+    return [RawEntity(item, model) for item in response.get("items") or []]
@@ -0,0 +1,36 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from typing import NamedTuple, Optional
+
+from ytapi.cancellation import CancelToken
+from ytapi.quota import QuotaLedger
+from ytapi.request_executor import RetryBudget
+
+
+class RequestContext(NamedTuple):
+    """
+    What one search or lookup runs with, passed down every call instead of being stored on the client,
+    so a single YouTubeAPI can serve concurrent searches for different markets.
+    """
+    language: str = "en"
+    region: str = "US"
+    cancel_token: Optional[CancelToken] = None
+    # Records, and with a budget limits, the quota the search spends.
+    ledger: Optional[QuotaLedger] = None
+    # The retries the search has left for transient failures.
+    retry_budget: Optional[RetryBudget] = None
+
+    @property
+    def hl(self) -> str:
+        return f"{self.language}_{self.region}"
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
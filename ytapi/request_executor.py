@@ -0,0 +1,271 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional, Tuple, Type, TypeVar
+
+import requests
+
+from ytapi.cancellation import CancelToken
+
+T = TypeVar("T")
+
+# Requests per second sent to YouTube by the whole process, and how many may go at once after a quiet spell.
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 10
+# The rate never adapts below this, however often YouTube pushes back.
+MIN_RATE = 0.5
+# Attempts per request, the first one included.
+DEFAULT_MAX_ATTEMPTS = 4
+# Backoff before retry n is a random delay of up to BASE_DELAY * 2**n seconds, capped at MAX_DELAY.
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+# Retries one search may make in total, so a failing network cannot keep it backing off for minutes.
+DEFAULT_RETRIES_PER_SEARCH = 20
+# Hedges in flight at once; past that, slow requests are left to finish on their own.
+HEDGE_WORKERS = 8
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# 403 reasons meaning slow down, rather than out of quota or forbidden.
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+# youtubesearchpython reports every failed request, whatever the cause, with this message.
+SCRAPE_REQUEST_FAILED = "Could not make request"
+
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, ConnectionError, TimeoutError)
+try:
+    # The scraped searches send their requests with httpx.
+    import httpx
+    TRANSIENT_ERRORS += (httpx.TransportError,)
+except ImportError:
+    pass
+
+
+def _status_code(err: BaseException) -> Optional[int]:
+    status_code = getattr(err, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(err, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def _error_reasons(err: BaseException) -> Tuple[str, ...]:
+    try:
+        return tuple(error.get("reason") for error in getattr(err, "response").json()["error"]["errors"])
+    except Exception:
+        return ()
+
+
+def is_rate_limited(err: BaseException) -> bool:
+    return _status_code(err) == 429 or any(reason in RATE_LIMIT_REASONS for reason in _error_reasons(err))
+
+
+def is_transient(err: BaseException) -> bool:
+    """
+    Whether the request may succeed if sent again: network errors, timeouts, 429 and 5xx responses.
+    """
+    if isinstance(err, TRANSIENT_ERRORS) or is_rate_limited(err):
+        return True
+    elif _status_code(err) in RETRYABLE_STATUS_CODES:
+        return True
+    return SCRAPE_REQUEST_FAILED in str(err)
+
+
+def retry_after(err: BaseException) -> Optional[float]:
+    """
+    The delay in seconds asked for by the response's Retry-After header, when it gives one in seconds.
+    """
+    try:
+        return max(float(getattr(err, "response").headers["Retry-After"]), 0.0)
+    except Exception:
+        return None
+
+
+class RetryBudget:
+    """
+    The retries one search has left, shared by every request it makes.
+    """
+
+    def __init__(self, retries: int = DEFAULT_RETRIES_PER_SEARCH) -> None:
+        self._lock = threading.Lock()
+        self.remaining: int = retries
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class TokenBucket:
+    """
+    Lets through rate requests per second on average and up to burst at once.
+
+    The rate adapts: it is halved each time YouTube says to slow down and creeps back up towards the
+    configured rate with every request that succeeds.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        self._lock = threading.Lock()
+        self.max_rate: float = rate
+        self.rate: float = rate
+        self.burst: int = burst
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated) * self.rate, float(self.burst))
+        self._updated = now
+
+    def acquire(self, cancel_token: Optional[CancelToken] = None) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            if cancel_token is not None:
+                cancel_token.sleep(delay)
+            else:
+                time.sleep(delay)
+
+    def throttle(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(self.rate / 2, MIN_RATE)
+
+    def recover(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.rate + MIN_RATE / 10, self.max_rate)
+
+    def configure(self, rate: Optional[float] = None, burst: Optional[int] = None) -> None:
+        with self._lock:
+            self._refill()
+            if rate is not None:
+                self.max_rate = rate
+                self.rate = rate
+            if burst is not None:
+                self.burst = burst
+
+
+class RequestExecutor:
+    """
+    Sends every request to YouTube, Data API and scraped alike, through one rate limiter, retrying the
+    ones that fail for transient reasons with jittered exponential backoff. A Retry-After header is
+    waited out in full.
+
+    With hedge_after set, a hedged request still unanswered after hedge_after seconds is sent a second
+    time from a thread of its own, unless HEDGE_WORKERS hedges are already out. The first attempt runs on
+    the calling thread and its answer is used when it succeeds; when it fails, the hedge's answer is
+    used instead of retrying, so a request stuck until its read timeout does not then wait out a backoff
+    as well. Only idempotent requests may be hedged, and each hedge of a Data API request costs its quota
+    again, so hedging is off by default. fn is called once per attempt sent, hedges included.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, max_attempts: int = DEFAULT_MAX_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY, hedge_after: Optional[float] = None) -> None:
+        self.bucket: TokenBucket = TokenBucket(rate, burst)
+        self.max_attempts: int = max_attempts
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.hedge_after: Optional[float] = hedge_after
+        self._hedge_slots = threading.BoundedSemaphore(HEDGE_WORKERS)
+
+    def configure(self, rate: Optional[float] = None, burst: Optional[int] = None, max_attempts: Optional[int] = None, hedge_after: Optional[float] = None) -> None:
+        """
+        A hedge_after of 0 turns hedging off.
+        """
+        self.bucket.configure(rate, burst)
+        if max_attempts is not None:
+            self.max_attempts = max_attempts
+        if hedge_after is not None:
+            self.hedge_after = hedge_after or None
+
+    def run(self, fn: Callable[[], T], cancel_token: Optional[CancelToken] = None, retry_budget: Optional[RetryBudget] = None, hedge: bool = False, retry: bool = True) -> T:
+        """
+        Calls fn until it succeeds, it fails with an error that is not transient, the attempts run out
+        or retry_budget does. The last error is re-raised.
+        With retry False, fn is only rate limited and called once, for calls that change state and cannot be repeated.
+        """
+        attempt = 0
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            self.bucket.acquire(cancel_token)
+            try:
+                result = self._attempt(fn, hedge, cancel_token)
+            except Exception as err:
+                attempt += 1
+                if not retry or not is_transient(err) or attempt >= self.max_attempts or (retry_budget is not None and not retry_budget.take()):
+                    raise
+                if is_rate_limited(err):
+                    self.bucket.throttle()
+                delay = self._backoff(attempt, retry_after(err))
+                print(f"Retrying in {delay:.1f}s after: {err}")
+                if cancel_token is not None:
+                    cancel_token.sleep(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            self.bucket.recover()
+            return result
+
+    def _backoff(self, attempt: int, requested: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.base_delay * 2 ** attempt, self.max_delay))
+        if requested is not None:
+            delay = max(delay, requested)
+        return delay
+
+    def _attempt(self, fn: Callable[[], T], hedge: bool, cancel_token: Optional[CancelToken]) -> T:
+        hedge_after = self.hedge_after
+        if not hedge or hedge_after is None:
+            return fn()
+        # Pending until the hedge is sent; cancelling it first means it never is.
+        backup: "Future[T]" = Future()
+        timer = threading.Timer(hedge_after, self._hedge, (fn, cancel_token, backup))
+        timer.name = "ytapi-hedge"
+        timer.daemon = True
+        timer.start()
+        try:
+            return fn()
+        except Exception as err:
+            if backup.cancel():
+                raise
+            try:
+                return backup.result()
+            except Exception:
+                raise err
+        finally:
+            timer.cancel()
+            backup.cancel()
+
+    def _hedge(self, fn: Callable[[], T], cancel_token: Optional[CancelToken], backup: "Future[T]") -> None:
+        if not self._hedge_slots.acquire(blocking=False):
+            backup.cancel()
+            return
+        try:
+            if not backup.set_running_or_notify_cancel():
+                # The first attempt has already finished.
+                return
+            try:
+                self.bucket.acquire(cancel_token)
+                backup.set_result(fn())
+            except BaseException as err:
+                backup.set_exception(err)
+        finally:
+            self._hedge_slots.release()
+
+
+# The process-wide executor used by YouTubeAPI unless it is given another.
+request_executor = RequestExecutor()
@@ -0,0 +1,181 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from ytapi.raw_json import dumps, loads
+
+# Seconds a raw response stays fresh, per Data API endpoint.
+ENDPOINT_TTLS: Dict[str, float] = {
+    "videos": 60 * 60,
+    "channels": 24 * 60 * 60,
+    "playlistItems": 60 * 60,
+    "comments": 24 * 60 * 60,
+    "search": 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_CACHE_PATH = Path("~").expanduser() / ".ytapi" / "response_cache.sqlite3"
+CACHE_PATH_ENV = "YTAPI_RESPONSE_CACHE"
+
+
+class EndpointStats(NamedTuple):
+    endpoint: str
+    entries: int
+    stored_bytes: int
+    expired: int
+
+
+class ResponseCache:
+    """
+    Raw API responses stored zlib compressed in SQLite, keyed by endpoint and request parameters.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES, ttls: Optional[Mapping[str, float]] = None) -> None:
+        self.path: Path = Path(path)
+        self.max_bytes: int = max_bytes
+        self.ttls: Dict[str, float] = dict(ENDPOINT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, params TEXT NOT NULL, "
+            "expires REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL, data BLOB NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._connection.commit()
+
+    @staticmethod
+    def _key(endpoint: str, params: Mapping[str, Any]) -> str:
+        return hashlib.sha1(f"{endpoint}?{ResponseCache._params_text(params)}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _params_text(params: Mapping[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, endpoint: str, params: Mapping[str, Any]) -> Optional[dict]:
+        key = self._key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT expires, data FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            expires, data = row
+            if expires <= now:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+        response: dict = loads(zlib.decompress(data))
+        return response
+
+    def put(self, endpoint: str, params: Mapping[str, Any], response: dict) -> None:
+        data = zlib.compress(dumps(response))
+        now = time.time()
+        expires = now + self.ttls.get(endpoint, DEFAULT_TTL)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, params, expires, accessed, size, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(endpoint, params), endpoint, self._params_text(params), expires, now, len(data), data),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        total: int = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._connection.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # Drop least recently used responses until we are back under 90% of the limit.
+        for key, size in self._connection.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            if total <= self.max_bytes * 0.9:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self) -> List[EndpointStats]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT endpoint, COUNT(*), SUM(size), SUM(expires <= ?) FROM responses GROUP BY endpoint ORDER BY endpoint",
+                (time.time(),),
+            ).fetchall()
+        return [EndpointStats(endpoint, entries, stored_bytes, expired) for endpoint, entries, stored_bytes, expired in rows]
+
+    def purge(self, endpoint: Optional[str] = None, expired_only: bool = False) -> int:
+        query = "DELETE FROM responses WHERE 1 = 1"
+        args: List[Any] = []
+        if endpoint:
+            query += " AND endpoint = ?"
+            args.append(endpoint)
+        if expired_only:
+            query += " AND expires <= ?"
+            args.append(time.time())
+        with self._lock:
+            removed: int = self._connection.execute(query, args).rowcount
+            self._connection.commit()
+            self._connection.execute("VACUUM")
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_response_cache() -> ResponseCache:
+    """
+    The process-wide cache, stored at $YTAPI_RESPONSE_CACHE or ~/.ytapi/response_cache.sqlite3.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(Path(os.environ.get(CACHE_PATH_ENV, str(DEFAULT_CACHE_PATH))))
+        return _default_cache
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m ytapi.response_cache", description="Inspect or purge the persistent API response cache.")
+    parser.add_argument("--path", type=Path, default=Path(os.environ.get(CACHE_PATH_ENV, str(DEFAULT_CACHE_PATH))))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show entries and stored size per endpoint.")
+    purge_parser = commands.add_parser("purge", help="Delete cached responses.")
+    purge_parser.add_argument("--endpoint", help="Only purge this endpoint, e.g. videos or channels.")
+    purge_parser.add_argument("--expired", action="store_true", help="Only purge expired responses.")
+    args = parser.parse_args(argv)
+
+    cache = ResponseCache(args.path)
+    if args.command == "stats":
+        print(f"Cache: {cache.path}")
+        for stats in cache.stats():
+            print(f"{stats.endpoint:<15} {stats.entries:>8} entries {stats.stored_bytes/1024:>10.1f} KiB {stats.expired:>8} expired")
+    elif args.command == "purge":
+        removed = cache.purge(endpoint=args.endpoint, expired_only=args.expired)
+        print(f"Removed {removed} cached responses from {cache.path}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Generic, List, NamedTuple, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class ResultDelta(Generic[T]):
+    """
+    The change between two consecutive result snapshots of a search.
+
+    Applying it means: drop the removed keys, append the added items, then, if order is set,
+    arrange the rows in that key order. seq starts at 1 for every new search.
+    """
+    seq: int
+    added: List[T] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    order: Optional[List[str]] = None
+
+
+class DeltaTracker(Generic[T]):
+    """
+    Turns the cumulative snapshots a yield_* generator produces into ResultDeltas.
+    Items are identified by key(item); when a key appears twice in a snapshot the first one wins.
+    """
+
+    def __init__(self, key: Callable[[T], str]) -> None:
+        self._key = key
+        self._order: List[str] = []
+        self._seq: int = 0
+
+    def diff(self, snapshot: Sequence[T]) -> Optional[ResultDelta[T]]:
+        """
+        Returns None when the snapshot is the same as the last one. The first delta of a search is always returned.
+        """
+        current: Dict[str, T] = {}
+        for item in snapshot:
+            current.setdefault(self._key(item), item)
+        known = set(self._order)
+        removed: List[str] = [key for key in self._order if key not in current]
+        added: List[T] = [item for key, item in current.items() if key not in known]
+        order: List[str] = list(current)
+        expected: List[str] = [key for key in self._order if key in current] + [key for key in current if key not in known]
+        if self._seq > 0 and not removed and not added and order == expected:
+            return None
+        self._order = order
+        self._seq += 1
+        return ResultDelta(self._seq, added, removed, order if order != expected else None)
+
+
+class StoreChange(NamedTuple):
+    # Rows removed, as indices into the rows before the delta, in ascending order.
+    removed_rows: List[int]
+    # Rows from this one onwards are new or moved, once the removed rows are gone.
+    first_changed_row: int
+
+
+class ResultStore(Generic[T]):
+    """
+    The receiving end of a DeltaTracker: rebuilds the current snapshot from the deltas.
+    """
+
+    def __init__(self, key: Callable[[T], str]) -> None:
+        self._key = key
+        self.items: List[T] = []
+        self.seq: int = 0
+
+    def clear(self) -> None:
+        self.items = []
+        self.seq = 0
+
+    def apply(self, delta: ResultDelta[T]) -> StoreChange:
+        if delta.seq == 1:
+            self.clear()
+        elif delta.seq != self.seq + 1:
+            raise ValueError(f"Result delta {delta.seq} does not follow delta {self.seq}.")
+        self.seq = delta.seq
+        removed_keys = set(delta.removed)
+        removed_rows: List[int] = [row for row, item in enumerate(self.items) if self._key(item) in removed_keys]
+        if removed_rows:
+            self.items = [item for item in self.items if self._key(item) not in removed_keys]
+        first_changed_row = len(self.items)
+        self.items.extend(delta.added)
+        if delta.order is not None:
+            kept_keys: List[str] = [self._key(item) for item in self.items[0: first_changed_row]]
+            by_key: Dict[str, T] = {self._key(item): item for item in self.items}
+            self.items = [by_key[key] for key in delta.order]
+            first_changed_row = next((row for row, key in enumerate(kept_keys) if key != delta.order[row]), first_changed_row)
+        return StoreChange(removed_rows, first_changed_row)
@@ -0,0 +1,112 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from typing import Any, Callable, Dict, List, Optional
+
+from PySide6 import QtCore
+from PySide6.QtCore import Qt
+
+from ytapi.result_delta import ResultDelta, ResultStore, StoreChange
+
+
+def addCommas(value: str) -> str:
+    splitValue = ""
+    for i, char in enumerate(value):
+        splitValue+=char
+        if (len(value)-(i+1)) % 3 == 0 and i != len(value)-1:
+            splitValue+=","
+    return splitValue
+
+
+class ResultTableModel(QtCore.QAbstractTableModel):
+    """
+    Table model over the results of one search tab.
+
+    Rows are kept as raw column values (one list per column, as built by columnsFor) and are only
+    formatted in data(), so the view formats just the cells it shows. Deltas insert, remove and
+    update rows in place instead of resetting the model.
+    """
+
+    def __init__(self, key: Callable[[Any], str], columnsFor: Callable[[list], Dict[str, list]], parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self._store: ResultStore[Any] = ResultStore(key)
+        self._columnsFor = columnsFor
+        self._headers: List[str] = list(columnsFor([]).keys())
+        self._columns: List[list] = [[] for _ in self._headers]
+        # Follows the column lists rather than the store, so the view sees the old row count until each change ends.
+        self._rowCount: int = 0
+
+    @property
+    def items(self) -> list:
+        return self._store.items
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rowCount
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self._headers):
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index: QtCore.QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self._columns[index.column()][index.row()]
+        if value is None:
+            return None
+        text = str(value)
+        return addCommas(text) if text.isnumeric() else value
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._store.clear()
+        self._columns = [[] for _ in self._headers]
+        self._rowCount = 0
+        self.endResetModel()
+
+    def applyDelta(self, delta: ResultDelta) -> None:
+        if delta.seq == 1:
+            self.clear()
+        oldRowCount = len(self._store.items)
+        change: StoreChange = self._store.apply(delta)
+        self._removeRows(change.removed_rows)
+        keptRowCount = oldRowCount - len(change.removed_rows)
+        newRowCount = len(self._store.items)
+        firstRow = change.first_changed_row
+        if firstRow >= newRowCount:
+            return
+        changedColumns = list(self._columnsFor(self._store.items[firstRow:]).values())
+        if firstRow < keptRowCount:
+            for column, changedColumn in zip(self._columns, changedColumns):
+                column[firstRow: keptRowCount] = changedColumn[0: keptRowCount-firstRow]
+            self.dataChanged.emit(self.index(firstRow, 0), self.index(keptRowCount-1, len(self._headers)-1))
+        if newRowCount > keptRowCount:
+            self.beginInsertRows(QtCore.QModelIndex(), keptRowCount, newRowCount-1)
+            for column, changedColumn in zip(self._columns, changedColumns):
+                column.extend(changedColumn[max(keptRowCount-firstRow, 0):])
+            self._rowCount = newRowCount
+            self.endInsertRows()
+
+    def _removeRows(self, rows: List[int]) -> None:
+        # Remove contiguous runs from the bottom up, so earlier row numbers stay valid.
+        end = len(rows) - 1
+        while end >= 0:
+            start = end
+            while start > 0 and rows[start-1] == rows[start] - 1:
+                start -= 1
+            first, last = rows[start], rows[end]
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            for column in self._columns:
+                del column[first: last+1]
+            self._rowCount -= last - first + 1
+            self.endRemoveRows()
+            end = start - 1
@@ -14,6 +14,7 @@ from typing import List, Optional, Dict
 from ytapi.explorer_app import ExplorerApp
 from ytapi.youtube_api import YouTubeAPI
 
+# Only the fields read here are downloaded, as listed in field_masks; add a column's fields there too.
 class StoredYoutubeData:
     def __init__(self) -> None:
         ...
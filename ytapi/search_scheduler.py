@@ -0,0 +1,135 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from PySide6 import QtCore
+
+from ytapi.backend import CHANNELS_SEARCH, COMMENTS_SEARCH, VIDEOS_SEARCH, Backend, SearchJob
+from ytapi.cancellation import CancelToken
+from ytapi.pyside import typed_signal
+
+# One worker per search tab, so a video, channel and comment search can all run at once.
+DEFAULT_NUM_WORKERS = 3
+
+
+class SearchScheduler(QtCore.QObject):
+    """
+    Runs searches on a pool of Backend workers, each on its own thread.
+
+    Jobs are started in the order they were requested. At most one job of each kind runs at a time, so the
+    deltas of two searches of the same kind never interleave on the way to their table; a request that cannot
+    start yet, because its kind is busy or every worker is, waits in the queue.
+
+    A new request cancels the running and queued jobs of its kind, and starts as soon as the cancelled
+    job has stopped.
+    """
+
+    @typed_signal.TypedSignal
+    def queueDepthChanged(self, depth: int):
+        ...
+
+    def __init__(self, numWorkers: int = DEFAULT_NUM_WORKERS, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self.workers: List[Backend] = []
+        self._threads: List[QtCore.QThread] = []
+        self._idle: Deque[Backend] = deque()
+        self._queue: Deque[SearchJob] = deque()
+        self._reportedDepth: int = 0
+        # The job each busy worker is running.
+        self._running: Dict[Backend, SearchJob] = {}
+        for _ in range(max(numWorkers, 1)):
+            worker = Backend(None)
+            thread = QtCore.QThread(None)
+            worker.moveToThread(thread)
+            worker.searchJobFinished.connect(self.onSearchJobFinished)
+            thread.start()
+            self.workers.append(worker)
+            self._threads.append(thread)
+            self._idle.append(worker)
+
+    def queueDepth(self) -> int:
+        return len(self._queue)
+
+    def runningKinds(self) -> List[str]:
+        return [job.kind for job in self._running.values()]
+
+    @typed_signal.TypedSlot
+    def onSearchVideosRequested(self, key: str, searchType: str, niche: str, num_videos: int, time_delta: int, language: str, region: str):
+        self.submit(SearchJob(VIDEOS_SEARCH, (key, searchType, niche, num_videos, time_delta, language, region), CancelToken()))
+
+    @typed_signal.TypedSlot
+    def onSearchChannelRequested(self, key: str, searchType: str, niche: str, num_channels: int, time_delta: int, min_subs: int, max_subs: int):
+        self.submit(SearchJob(CHANNELS_SEARCH, (key, searchType, niche, num_channels, time_delta, min_subs, max_subs), CancelToken()))
+
+    @typed_signal.TypedSlot
+    def onSearchCommentsRequested(self, key: str, video_id: str, keywords: str, num_comments: int):
+        self.submit(SearchJob(COMMENTS_SEARCH, (key, video_id, keywords, num_comments), CancelToken()))
+
+    def submit(self, job: SearchJob) -> None:
+        self._cancel(job.kind)
+        self._queue.append(job)
+        self._dispatch()
+
+    @typed_signal.TypedSlot
+    def cancel(self, kind: str) -> None:
+        """
+        Stops the running and queued searches of a kind. The running one stops at its next check: requests
+        already sent, and the items its pipeline stages are working on, are finished first and then dropped.
+        """
+        self._cancel(kind)
+        self._dispatch()
+
+    def _cancel(self, kind: str) -> None:
+        for job in self._running.values():
+            if job.kind == kind:
+                job.cancelToken.cancel()
+        for job in self._queue:
+            if job.kind == kind:
+                job.cancelToken.cancel()
+        self._queue = deque(job for job in self._queue if job.kind != kind)
+
+    @typed_signal.TypedSlot
+    def onSearchJobFinished(self) -> None:
+        worker = self.sender()
+        if isinstance(worker, Backend) and worker in self._running:
+            del self._running[worker]
+            self._idle.append(worker)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        busyKinds = {job.kind for job in self._running.values()}
+        waiting: Deque[SearchJob] = deque()
+        while self._queue:
+            job = self._queue.popleft()
+            if not self._idle or job.kind in busyKinds:
+                waiting.append(job)
+                continue
+            worker = self._idle.popleft()
+            self._running[worker] = job
+            busyKinds.add(job.kind)
+            worker.runSearch(job)
+        self._queue = waiting
+        if len(self._queue) != self._reportedDepth:
+            self._reportedDepth = len(self._queue)
+            self.queueDepthChanged.emit(self._reportedDepth)
+
+    @typed_signal.TypedSlot
+    def shutdown(self) -> None:
+        """
+        Cancels every search and stops the worker threads. Queued jobs are dropped.
+        """
+        self._queue.clear()
+        for job in self._running.values():
+            job.cancelToken.cancel()
+        for thread in self._threads:
+            thread.quit()
+        for thread in self._threads:
+            thread.wait()
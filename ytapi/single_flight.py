@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import threading
+from concurrent.futures import Future, wait
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from pyyoutube import Channel, Video
+
+from ytapi.cancellation import CancelToken
+
+T = TypeVar("T")
+
+# How often a caller waiting on another's request checks whether its own search was cancelled, in seconds.
+_POLL_INTERVAL = 0.1
+
+
+class SingleFlight(Generic[T]):
+    """
+    Lets concurrent lookups of the same id share one request. The first caller to ask for an id fetches it;
+    callers asking for it while that request is in flight wait for its result instead of sending their own.
+
+    Ids are only shared within a scope, such as the market the entity is localised for. If the request
+    fails, its waiters fetch the id again themselves, so one search's cancellation or error never
+    reaches another. A waiter whose own search is cancelled stops waiting; the request it was waiting on
+    still completes for the others.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], "Future[Optional[T]]"] = {}
+
+    def run(self, scope: str, ids: List[str], fetch: Callable[[List[str]], Dict[str, T]], cancel_token: Optional[CancelToken] = None) -> Dict[str, T]:
+        """
+        Fetches ids with fetch, which returns what it found by id, skipping those already in flight.
+        Returns every entity found, by id. Raises SearchCancelled if cancel_token is cancelled while
+        waiting on another caller's request.
+        """
+        owned: List[str] = []
+        waiting: Dict[str, "Future[Optional[T]]"] = {}
+        with self._lock:
+            for entity_id in ids:
+                call = self._calls.get((scope, entity_id))
+                if call is None:
+                    self._calls[(scope, entity_id)] = Future()
+                    owned.append(entity_id)
+                else:
+                    waiting[entity_id] = call
+        found: Dict[str, T] = {}
+        try:
+            if owned:
+                found = fetch(owned)
+        except BaseException as err:
+            self._finish(scope, owned, {}, err)
+            raise
+        # The owned ids are settled before waiting on anyone else's, so two callers never wait on each other.
+        self._finish(scope, owned, found)
+        failed: List[str] = []
+        for entity_id, call in waiting.items():
+            self._wait(call, cancel_token)
+            try:
+                value = call.result()
+            except BaseException:
+                failed.append(entity_id)
+                continue
+            if value is not None:
+                found[entity_id] = value
+        if failed:
+            # Shared again, so the waiters of a failed request still send it only once between them.
+            found.update(self.run(scope, failed, fetch, cancel_token))
+        return found
+
+    @staticmethod
+    def _wait(call: "Future[Optional[T]]", cancel_token: Optional[CancelToken]) -> None:
+        if cancel_token is None:
+            wait([call])
+            return
+        while not wait([call], timeout=_POLL_INTERVAL).done:
+            cancel_token.raise_if_cancelled()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def _finish(self, scope: str, owned: List[str], found: Dict[str, T], error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            calls = [self._calls.pop((scope, entity_id)) for entity_id in owned]
+        for entity_id, call in zip(owned, calls):
+            if error is not None:
+                call.set_exception(error)
+            else:
+                call.set_result(found.get(entity_id))
+
+
+class InFlightLookups:
+    def __init__(self) -> None:
+        self.videos: SingleFlight[Video] = SingleFlight()
+        self.channels: SingleFlight[Channel] = SingleFlight()
+
+
+# Shared by every YouTubeAPI in the process unless one is given its own.
+in_flight_lookups = InFlightLookups()
@@ -39,6 +39,11 @@ class Ui_Dialog(object):
 
         self.verticalLayout.addWidget(self.lineEdit_APIKEY)
 
+        self.label_quotaUsage = QLabel(self.horizontalLayoutWidget_3)
+        self.label_quotaUsage.setObjectName(u"label_quotaUsage")
+
+        self.verticalLayout.addWidget(self.label_quotaUsage)
+
         self.verticalLayout_3 = QVBoxLayout()
         self.verticalLayout_3.setObjectName(u"verticalLayout_3")
         self.verticalLayout_3.setContentsMargins(-1, 0, -1, 0)
@@ -132,13 +137,19 @@ class Ui_Dialog(object):
 
         self.horizontalLayout_7.addWidget(self.pushButton_searchVideos)
 
+        self.pushButton_stopVideos = QPushButton(self.horizontalLayoutWidget_3)
+        self.pushButton_stopVideos.setObjectName(u"pushButton_stopVideos")
+        self.pushButton_stopVideos.setEnabled(False)
+
+        self.horizontalLayout_7.addWidget(self.pushButton_stopVideos)
+
 
         self.verticalLayout_3.addLayout(self.horizontalLayout_7)
 
-        self.tableWidget_videos = QTableWidget(self.horizontalLayoutWidget_3)
-        self.tableWidget_videos.setObjectName(u"tableWidget_videos")
+        self.tableView_videos = QTableView(self.horizontalLayoutWidget_3)
+        self.tableView_videos.setObjectName(u"tableView_videos")
 
-        self.verticalLayout_3.addWidget(self.tableWidget_videos)
+        self.verticalLayout_3.addWidget(self.tableView_videos)
 
         self.horizontalLayout_8 = QHBoxLayout()
         self.horizontalLayout_8.setObjectName(u"horizontalLayout_8")
@@ -261,13 +272,19 @@ class Ui_Dialog(object):
 
         self.horizontalLayout_10.addWidget(self.pushButton_searchChannel)
 
+        self.pushButton_stopChannel = QPushButton(self.horizontalLayoutWidget_3)
+        self.pushButton_stopChannel.setObjectName(u"pushButton_stopChannel")
+        self.pushButton_stopChannel.setEnabled(False)
+
+        self.horizontalLayout_10.addWidget(self.pushButton_stopChannel)
+
 
         self.verticalLayout_4.addLayout(self.horizontalLayout_10)
 
-        self.tableWidget_channel = QTableWidget(self.horizontalLayoutWidget_3)
-        self.tableWidget_channel.setObjectName(u"tableWidget_channel")
+        self.tableView_channel = QTableView(self.horizontalLayoutWidget_3)
+        self.tableView_channel.setObjectName(u"tableView_channel")
 
-        self.verticalLayout_4.addWidget(self.tableWidget_channel)
+        self.verticalLayout_4.addWidget(self.tableView_channel)
 
         self.horizontalLayout_11 = QHBoxLayout()
         self.horizontalLayout_11.setObjectName(u"horizontalLayout_11")
@@ -360,18 +377,24 @@ class Ui_Dialog(object):
 
         self.horizontalLayout_2.addWidget(self.pushButton_searchComments)
 
+        self.pushButton_stopComments = QPushButton(self.horizontalLayoutWidget_3)
+        self.pushButton_stopComments.setObjectName(u"pushButton_stopComments")
+        self.pushButton_stopComments.setEnabled(False)
+
+        self.horizontalLayout_2.addWidget(self.pushButton_stopComments)
+
 
         self.verticalLayout_2.addLayout(self.horizontalLayout_2)
 
-        self.tableWidget_comments = QTableWidget(self.horizontalLayoutWidget_3)
-        self.tableWidget_comments.setObjectName(u"tableWidget_comments")
+        self.tableView_comments = QTableView(self.horizontalLayoutWidget_3)
+        self.tableView_comments.setObjectName(u"tableView_comments")
         sizePolicy2 = QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         sizePolicy2.setHorizontalStretch(0)
         sizePolicy2.setVerticalStretch(0)
-        sizePolicy2.setHeightForWidth(self.tableWidget_comments.sizePolicy().hasHeightForWidth())
-        self.tableWidget_comments.setSizePolicy(sizePolicy2)
+        sizePolicy2.setHeightForWidth(self.tableView_comments.sizePolicy().hasHeightForWidth())
+        self.tableView_comments.setSizePolicy(sizePolicy2)
 
-        self.verticalLayout_2.addWidget(self.tableWidget_comments)
+        self.verticalLayout_2.addWidget(self.tableView_comments)
 
         self.horizontalLayout_5 = QHBoxLayout()
         self.horizontalLayout_5.setObjectName(u"horizontalLayout_5")
@@ -406,6 +429,7 @@ class Ui_Dialog(object):
     def retranslateUi(self, Dialog):
         Dialog.setWindowTitle(QCoreApplication.translate("Dialog", u"Youtube Scraper", None))
         self.lineEdit_APIKEY.setText(QCoreApplication.translate("Dialog", u"***INPUT API KEY HERE***", None))
+        self.label_quotaUsage.setText("")
         self.label_4.setText(QCoreApplication.translate("Dialog", u"<html><head/><body><p align=\"center\">Video search tool:</p><p align=\"center\"><span style=\" font-size:7pt;\">Most viewed videos posted in the last N days, highest views/subs ratio videos posted in the last N days, and recycled videos older than N years being pushed.</span></p></body></html>", None))
         self.comboBox_searchTypeVideo.setItemText(0, QCoreApplication.translate("Dialog", u"Most Viewed", None))
         self.comboBox_searchTypeVideo.setItemText(1, QCoreApplication.translate("Dialog", u"Most Pushed", None))
@@ -417,6 +441,7 @@ class Ui_Dialog(object):
         self.label_13.setText(QCoreApplication.translate("Dialog", u"Language/Region", None))
         self.lineEdit_languageRegion.setText(QCoreApplication.translate("Dialog", u"en/US", None))
         self.pushButton_searchVideos.setText(QCoreApplication.translate("Dialog", u"Search", None))
+        self.pushButton_stopVideos.setText(QCoreApplication.translate("Dialog", u"Stop", None))
         self.pushButton_exportVideos.setText(QCoreApplication.translate("Dialog", u"Export", None))
         self.label_8.setText(QCoreApplication.translate("Dialog", u"<html><head/><body><p align=\"center\">Channel search tool:</p><p align=\"center\"><span style=\" font-size:7pt;\">Channels that have posted in the last N days and sorted by subscribers or sorted byviews in the last N days.</span></p></body></html>", None))
         self.comboBox_sortTypeChannel.setItemText(0, QCoreApplication.translate("Dialog", u"Sort by Subs", None))
@@ -428,11 +453,13 @@ class Ui_Dialog(object):
         self.label_10.setText(QCoreApplication.translate("Dialog", u"Max subs", None))
         self.label_11.setText(QCoreApplication.translate("Dialog", u"Days:", None))
         self.pushButton_searchChannel.setText(QCoreApplication.translate("Dialog", u"Search", None))
+        self.pushButton_stopChannel.setText(QCoreApplication.translate("Dialog", u"Stop", None))
         self.pushButton_exportChannel.setText(QCoreApplication.translate("Dialog", u"Export", None))
         self.label_3.setText(QCoreApplication.translate("Dialog", u"<html><head/><body><p align=\"center\">Comments search tool:</p><p align=\"center\"><span style=\" font-size:7pt;\">Input video ID and keywords should be split with a space.</span></p></body></html>", None))
         self.label.setText(QCoreApplication.translate("Dialog", u"Video ID:", None))
         self.label_2.setText(QCoreApplication.translate("Dialog", u"Keywords:", None))
         self.pushButton_searchComments.setText(QCoreApplication.translate("Dialog", u"Search", None))
+        self.pushButton_stopComments.setText(QCoreApplication.translate("Dialog", u"Stop", None))
         self.pushButton_exportComments.setText(QCoreApplication.translate("Dialog", u"Export", None))
     # retranslateUi
 
@@ -0,0 +1,83 @@
+# -----------------------------------------------------------------------------------------------------
+# Youtube Minecraft Scraper - All Rights Reserved
+# -----------------------------------------------------------------------------------------------------
+# Copyright (C) Scott Jones - All Rights Reserved
+# Unauthorized copying of this file, via any medium is strictly prohibited
+# Proprietary and confidential
+# Authors:
+# - Scott Jones <scott.jones9336@gmail.com>
+# -----------------------------------------------------------------------------------------------------
+import time
+from typing import Any, Callable, Optional
+
+from PySide6 import QtCore
+
+from ytapi.pyside import typed_signal
+from ytapi.result_delta import DeltaTracker, ResultDelta, ResultStore
+
+DEFAULT_MAX_UPDATES_PER_SECOND = 10
+
+
+class UpdateCoalescer(QtCore.QObject):
+    """
+    Sits between a Backend results signal and the view, on the GUI thread.
+
+    Incoming deltas are folded into a shadow ResultStore, and at most maxUpdatesPerSecond times a second
+    the net change since the last flush is sent on as a single delta. onComplete flushes whatever is left
+    before passing the completion on, so the view always ends on the final results.
+    """
+
+    @typed_signal.TypedSignal
+    def results(self, delta: ResultDelta):
+        ...
+
+    @typed_signal.TypedSignal
+    def complete(self):
+        ...
+
+    def __init__(self, key: Callable[[Any], str], maxUpdatesPerSecond: float = DEFAULT_MAX_UPDATES_PER_SECOND, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self._key = key
+        self._store: ResultStore[Any] = ResultStore(key)
+        self._deltas: DeltaTracker[Any] = DeltaTracker(key)
+        self.minInterval: float = 1.0 / maxUpdatesPerSecond
+        self._lastFlush: float = 0.0
+        self._pending: bool = False
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.onFlushTimeout)
+
+    @typed_signal.TypedSlot
+    def onResults(self, delta: ResultDelta) -> None:
+        if delta.seq == 1:
+            # A new search: whatever was pending belonged to the old one.
+            self._timer.stop()
+            self._deltas = DeltaTracker(self._key)
+        self._store.apply(delta)
+        self._pending = True
+        if self._timer.isActive():
+            return
+        wait = self._lastFlush + self.minInterval - time.monotonic()
+        if wait <= 0:
+            self.flush()
+        else:
+            self._timer.start(int(wait * 1000) + 1)
+
+    @typed_signal.TypedSlot
+    def onComplete(self) -> None:
+        self._timer.stop()
+        self.flush()
+        self.complete.emit()
+
+    @typed_signal.TypedSlot
+    def onFlushTimeout(self) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self._pending = False
+        self._lastFlush = time.monotonic()
+        delta = self._deltas.diff(self._store.items)
+        if delta:
+            self.results.emit(delta)
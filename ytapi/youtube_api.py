@@ -8,38 +8,285 @@
 # - Scott Jones <scott.jones9336@gmail.com>
 # -----------------------------------------------------------------------------------------------------
 import datetime
-from typing import List, Optional, Tuple, Iterable
-from pyyoutube import Api, Channel, Video, PlaylistItem, Comment
+import math
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, TypeVar, Iterable, Iterator
+from pyyoutube import PyYouTubeException, Channel, Video, PlaylistItem, Comment
 from youtubesearchpython import ChannelsSearch, VideosSearch, CustomSearch, VideoSortOrder, Comments
 
+from ytapi.cancellation import CancelToken, SearchCancelled
+from ytapi.data_api_search import DATA_API_SEARCH, SCRAPE_SEARCH, SEARCH_PAGE_SIZE, DataAPISearch, days_ago_cutoff, years_ago_cutoff
+from ytapi.client_registry import ClientRegistry, client_registry
+from ytapi.concurrency import Mapper, default_mapper
+from ytapi.entity_cache import EntityCaches, entity_caches
+from ytapi.field_masks import CHANNEL_MASK, COMMENT_MASK, UPLOADS_MASK, VIDEO_CHANNEL_MASK, VIDEO_MASK, VIDEO_VIEWS_MASK, FieldMask
+from ytapi.pipeline import Pipeline
+from ytapi.quota import QuotaBudgetExceeded, QuotaLedger, QuotaTracker, is_quota_exceeded, quota_cost, quota_tracker, split_api_keys
+from ytapi.ranking import TopK
+from ytapi.raw_json import items_of, parse_response
+from ytapi.request_context import RequestContext
+from ytapi.request_executor import RequestExecutor, RetryBudget, is_transient, request_executor
+from ytapi.response_cache import ResponseCache
+from ytapi.single_flight import InFlightLookups, in_flight_lookups
+
+T = TypeVar("T")
+
+# The Data API accepts at most 50 comma separated ids per list request.
+MAX_IDS_PER_REQUEST = 50
+# Uploads pages read per channel before giving up on reaching the end of the time window.
+MAX_UPLOAD_SCAN_PAGES = 4
+# Results on a page of the scraped searches.
+SCRAPED_PAGE_SIZE = 20
+
+# Search modes, one per yield_* generator, as understood by YouTubeAPI.estimate_quota.
+MOST_VIEWED_MODE = "most_viewed"
+SMALL_VIDEOS_MODE = "small_videos"
+PUSHED_MODE = "pushed"
+OLD_VIDEOS_MODE = "old_videos"
+SMALL_CHANNELS_MODE = "small_channels"
+COMMENTS_MODE = "comments"
+SEARCH_MODES = (MOST_VIEWED_MODE, SMALL_VIDEOS_MODE, PUSHED_MODE, OLD_VIDEOS_MODE, SMALL_CHANNELS_MODE, COMMENTS_MODE)
+
+def _chunked(ids: Sequence[str], size: int = MAX_IDS_PER_REQUEST) -> Iterable[List[str]]:
+    for start in range(0, len(ids), size):
+        yield list(ids[start:start+size])
+
+def estimate_quota(mode: str, num_results: int, search_backend: str = SCRAPE_SEARCH, with_views: bool = False) -> Dict[str, int]:
+    """
+    A dry run: the quota units per endpoint a search would spend, predicted from its parameters without sending
+    anything. It assumes every result on a page is kept and nothing is cached, so searches whose filters throw
+    most results away will spend more. with_views is for channel searches sorted by recent views.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode {mode!r}, expected one of {', '.join(SEARCH_MODES)}.")
+    units: Dict[str, int] = {}
+    if mode == COMMENTS_MODE:
+        # One comments.list request per scraped page of comment ids.
+        units["comments"] = math.ceil(num_results / SCRAPED_PAGE_SIZE) * quota_cost("comments")
+    elif mode == SMALL_CHANNELS_MODE:
+        pages = math.ceil(num_results / SCRAPED_PAGE_SIZE)
+        units["channels"] = pages * quota_cost("channels")
+        units["playlistItems"] = pages * SCRAPED_PAGE_SIZE * quota_cost("playlistItems")
+        if with_views:
+            units["videos"] = math.ceil(num_results / MAX_IDS_PER_REQUEST) * quota_cost("videos")
+    else:
+        data_api = search_backend == DATA_API_SEARCH
+        pages = math.ceil(num_results / (SEARCH_PAGE_SIZE if data_api else SCRAPED_PAGE_SIZE))
+        if data_api:
+            units["search"] = pages * quota_cost("search")
+        units["videos"] = pages * quota_cost("videos")
+        if mode == PUSHED_MODE:
+            units["channels"] = pages * quota_cost("channels")
+    return units
+
+class ChannelActivity(NamedTuple):
+    """
+    What a channel uploaded within a search's time delta, computed once per channel per search.
+    recent_views stays None until something needs it, as it costs a videos.list lookup.
+    """
+    channel_id: str
+    recent_uploads: int
+    recent_video_ids: Tuple[str, ...]
+    latest_published_at: Optional[str]
+    recent_views: Optional[int] = None
+
 class YouTubeAPI:
-    def __init__(self, api_key: str, language: str = "en", region: str = "US") -> None:
-        self.api_key: str = api_key
-        self.api: Api = Api(api_key=api_key)
+    def __init__(self, api_key: str, language: str = "en", region: str = "US", caches: Optional[EntityCaches] = None, response_cache: Optional[ResponseCache] = None, mapper: Optional[Mapper] = None, search_backend: str = SCRAPE_SEARCH, clients: Optional[ClientRegistry] = None, quota: Optional[QuotaTracker] = None, executor: Optional[RequestExecutor] = None, in_flight: Optional[InFlightLookups] = None) -> None:
+        """
+        api_key may be a comma separated list of keys. Requests go to the key with the most quota left,
+        moving on to the next key when YouTube reports one out of quota.
+        """
+        self.api_keys: List[str] = split_api_keys(api_key)
+        self.api_key: str = self.api_keys[0] if self.api_keys else api_key
+        # Shared with every other client for the same key, along with its pooled connections.
+        self.clients: ClientRegistry = clients if clients is not None else client_registry
+        self.quota: QuotaTracker = quota if quota is not None else quota_tracker
+        # Rate limits and retries every request, shared with every other client.
+        self.executor: RequestExecutor = executor if executor is not None else request_executor
+        # The market used when a call gives no context. Never changed afterwards, so the client can be shared between threads.
         self.language: str = language
         self.region: str = region
+        self.caches: EntityCaches = caches if caches is not None else entity_caches
+        # Lookups of the same ids by concurrent searches share one request.
+        self.in_flight: InFlightLookups = in_flight if in_flight is not None else in_flight_lookups
+        self.response_cache: Optional[ResponseCache] = response_cache
+        # SCRAPE_SEARCH is free but filters client side, DATA_API_SEARCH filters server side for 100 units a page.
+        self.search_backend: str = search_backend
+        # Runs independent lookups (id chunks and per channel uploads).
+        self._map: Mapper = mapper if mapper is not None else default_mapper()
+        if mapper is None:
+            self.clients.ensure_pool_size(default_mapper().max_workers)
 
-    def get_channel_info_by_id(self, channel_id: str) -> Optional[Channel]:
-        channel_info_list: List[Channel] = self.api.get_channel_info(channel_id=channel_id, hl=f"{self.language}_{self.region}").items
-        if len(channel_info_list) == 1:
-            channel_info: Channel = channel_info_list[0]
-            return channel_info
-        else:
-            return None
+    def request_context(self, language: Optional[str] = None, region: Optional[str] = None, cancel_token: Optional[CancelToken] = None, ledger: Optional[QuotaLedger] = None, retry_budget: Optional[RetryBudget] = None) -> RequestContext:
+        """
+        A context for the given market, or for the client's default market unless both language and region are given.
+        Once cancel_token is cancelled, every network call made with the context raises SearchCancelled.
+        The quota spent with the context is recorded in ledger. Its requests share retry_budget, or a new one.
+        """
+        if not language or not region:
+            language = self.language
+            region = self.region
+        return RequestContext(language, region, cancel_token, ledger, retry_budget if retry_budget is not None else RetryBudget())
 
-    def _get_channels_from_search(self, channel_search: ChannelsSearch, max_channels: int = 100) -> List[Channel]:
-        channels: List[Channel] = []
+    def _in_market(self, context: Optional[RequestContext], language: Optional[str], region: Optional[str]) -> RequestContext:
+        if context is None:
+            return self.request_context(language, region)
+        elif language and region:
+            return context._replace(language=language, region=region)
+        return context
+
+    @staticmethod
+    def _with_budget(context: RequestContext, max_quota: Optional[int]) -> RequestContext:
+        """
+        Limits the search to max_quota units in a new ledger. A ledger already on the context is left as it
+        is: its budget, if any, was set by whoever made it, for everything charged to it.
+        """
+        if max_quota is None or context.ledger is not None:
+            return context
+        return context._replace(ledger=QuotaLedger(max_quota))
+
+    def estimate_quota(self, mode: str, num_results: int, with_views: bool = False) -> Dict[str, int]:
+        return estimate_quota(mode, num_results, self.search_backend, with_views)
+
+    def _call(self, resource: str, context: RequestContext, **params: Any) -> dict:
+        """
+        Sends a GET to a Data API resource and returns the raw json, answering from the response cache when possible.
+        params use the Data API names (id, part, hl, ...) and never include the api key.
+        """
+        context.raise_if_cancelled()
+        if self.response_cache is not None:
+            cached_response = self.response_cache.get(resource, params)
+            if cached_response is not None:
+                return cached_response
+        response = self._request_with_any_key(resource, params, context)
+        if self.response_cache is not None:
+            self.response_cache.put(resource, params, response)
+        # A request already in flight when the search was cancelled still completes, but its results go no further.
+        context.raise_if_cancelled()
+        return response
+
+    def _send(self, fn: Callable[[], T], context: RequestContext, hedge: bool = False, retry: bool = True) -> T:
+        """
+        Sends a request through the shared executor, which rate limits it and, unless retry is False, retries transient failures.
+        """
+        return self.executor.run(fn, context.cancel_token, context.retry_budget, hedge, retry)
+
+    def _request_with_any_key(self, resource: str, params: Dict[str, Any], context: RequestContext) -> dict:
+        cost = quota_cost(resource)
+        while True:
+            # Raises QuotaExhausted once no key is left.
+            api_key = self.quota.choose(self.api_keys or [self.api_key], cost)
+            try:
+                response: dict = self._send(partial(self._send_with_key, resource, params, api_key, context), context, hedge=True)
+                return response
+            except PyYouTubeException as err:
+                if not is_quota_exceeded(err):
+                    raise
+                self.quota.mark_exhausted(api_key)
+
+    def _send_with_key(self, resource: str, params: Dict[str, Any], api_key: str, context: RequestContext) -> dict:
+        """
+        One attempt at a request, charged to the search and to the key as it is sent, so retries and hedges are charged too.
+        """
+        cost = quota_cost(resource)
+        if context.ledger is not None:
+            # Raises QuotaBudgetExceeded, before anything is sent, once the search is out of budget.
+            context.ledger.charge(resource, cost)
+        self.quota.charge(api_key, cost)
+        # pyyoutube adds the key; parse_response raises PyYouTubeException on api errors as pyyoutube would.
+        return parse_response(self.clients.api(api_key)._request(resource=resource, args=dict(params)))
+
+    def _next_page(self, search: Any, context: RequestContext) -> bool:
+        """
+        Moves a search on to its next page. Returns False at the end of the results.
+        """
+        context.raise_if_cancelled()
         try:
-            search_result = channel_search.result()
-        except:
-            return []
-        if not isinstance(search_result, dict) or "result" not in search_result:
-            return channels
-        channels_ids_found: Iterable[str] = [channel["id"] for channel in search_result["result"]]
+            if isinstance(search, DataAPISearch):
+                # Its requests already go through _call, and so through the executor.
+                search.next()
+            else:
+                # next() moves the scraper's continuation on, so it is never sent twice.
+                self._send(search.next, context, retry=False)
+        except (SearchCancelled, QuotaBudgetExceeded):
+            raise
+        except Exception as err:
+            if is_transient(err):
+                # A network failure, which is not the end of the results.
+                print(f"Search stopped early: {err}")
+            return False
+        context.raise_if_cancelled()
+        return True
+
+    def _search_pages(self, search: Any, context: RequestContext, max_results: Optional[int] = None) -> Iterator[List[str]]:
+        """
+        The result ids of each page of a search, up to max_results a page, until a page is empty or the results end.
+        """
+        while True:
+            try:
+                search_result = search.result()
+            except:
+                return
+            if not isinstance(search_result, dict) or "result" not in search_result:
+                return
+            ids: List[str] = [result["id"] for result in search_result["result"]][0: max_results]
+            if not ids:
+                return
+            yield ids
+            if not self._next_page(search, context):
+                return
+
+    def _search_pipeline(self, search: Any, context: RequestContext, stages: Sequence[Callable[[Any], Any]], max_results: Optional[int] = None) -> Pipeline:
+        """
+        Runs a search as a pipeline: the next page is fetched while the stages work on the current one.
+        Data API searches are not run ahead, as a page fetched and never used would still cost 100 units.
+        """
+        return Pipeline(self._search_pages(search, context, max_results), stages, threaded=not isinstance(search, DataAPISearch))
+
+    @staticmethod
+    def _cache_scope(context: RequestContext, mask: FieldMask) -> str:
+        """
+        Entities are cached and shared per market and per mask, as a masked entity lacks the other fields.
+        """
+        return f"{context.hl}:{mask.name}"
+
+    def get_channel_info_by_id(self, channel_id: str, context: Optional[RequestContext] = None, mask: FieldMask = CHANNEL_MASK) -> Optional[Channel]:
+        return self.get_channels_by_ids([channel_id], context=context, mask=mask).get(channel_id)
+
+    def get_channels_by_ids(self, channel_ids: Iterable[Optional[str]], context: Optional[RequestContext] = None, mask: FieldMask = CHANNEL_MASK) -> Dict[str, Channel]:
+        """
+        Fetches the channels with as few channels.list requests as possible, with only the fields in mask.
+        Ids that could not be found are left out of the returned dict.
+        """
+        context = context if context is not None else self.request_context()
+        scope = self._cache_scope(context, mask)
+        unique_ids: List[str] = list(dict.fromkeys(channel_id for channel_id in channel_ids if channel_id))
+        cached = self.caches.channels.get_many(f"{scope}:{channel_id}" for channel_id in unique_ids)
+        channels_by_id: Dict[str, Channel] = {key.rsplit(":", 1)[1]: channel for key, channel in cached.items()}
+        uncached_ids: List[str] = [channel_id for channel_id in unique_ids if channel_id not in channels_by_id]
+        channels_by_id.update(self.in_flight.channels.run(scope, uncached_ids, partial(self._fetch_channels, context=context, mask=mask), context.cancel_token))
+        return channels_by_id
+
+    def _fetch_channels(self, channel_ids: List[str], context: RequestContext, mask: FieldMask) -> Dict[str, Channel]:
+        channels_by_id: Dict[str, Channel] = {}
+        for fetched in self._map(partial(self._fetch_channels_chunk, context=context, mask=mask), list(_chunked(channel_ids))):
+            channels_by_id.update(fetched)
+        return channels_by_id
+
+    def _fetch_channels_chunk(self, chunk: List[str], context: RequestContext, mask: FieldMask) -> Dict[str, Channel]:
+        scope = self._cache_scope(context, mask)
+        channel_info_list: List[Channel] = items_of(self._call("channels", context, id=",".join(chunk), part=mask.part, fields=mask.fields, hl=context.hl), Channel)
+        fetched: Dict[str, Channel] = {channel_info.id: channel_info for channel_info in channel_info_list if channel_info.id}
+        self.caches.channels.put_many({f"{scope}:{channel_id}": channel_info for channel_id, channel_info in fetched.items()})
+        return fetched
+
+    def _hydrate_channels(self, channels_ids_found: List[str], context: RequestContext, max_channels: int = 100) -> List[Channel]:
+        channels: List[Channel] = []
+        channels_by_id = self.get_channels_by_ids(channels_ids_found, context=context)
         for channel_id in channels_ids_found:
             if len(channels) == max_channels:
                 break
-            channel_info = self.get_channel_info_by_id(channel_id)
+            channel_info = channels_by_id.get(channel_id)
             if channel_info:
                 channels.append(channel_info)
         return channels
@@ -54,12 +301,46 @@ class YouTubeAPI:
                 filtered_channels.append(channel)
         return filtered_channels
 
-    def _filter_by_activity(self, channels: Iterable[Channel], min_activity: int = 1, time_delta: int = 14) -> List[Channel]:
+    def get_channel_activities(self, channels: Iterable[Channel], time_delta: int, activities: Optional[Dict[str, ChannelActivity]] = None, with_views: bool = False, context: Optional[RequestContext] = None) -> Dict[str, ChannelActivity]:
+        """
+        Adds the activity of every channel not already in activities, scanning their uploads in parallel.
+        Channels whose uploads could not be read are left out.
+        with_views also fills in recent_views, hydrating the recent uploads in batches.
+        """
+        if activities is None:
+            activities = {}
+        context = context if context is not None else self.request_context()
+        channels = list(channels)
+        missing_by_id: Dict[str, Channel] = {channel.id: channel for channel in channels if channel.id and channel.id not in activities}
+        missing_channels: List[Channel] = list(missing_by_id.values())
+        scan = partial(self._scan_recent_uploads_or_none, time_delta=time_delta, context=context)
+        for channel, upload_items in zip(missing_channels, self._map(scan, missing_channels)):
+            if upload_items is None:
+                continue
+            recent_video_ids: List[str] = [item.contentDetails.videoId for item in upload_items if item.contentDetails.videoId and self._isRecentDate(item.contentDetails.videoPublishedAt, time_delta)]
+            published_ats: List[str] = [item.contentDetails.videoPublishedAt for item in upload_items if item.contentDetails.videoPublishedAt]
+            activities[channel.id] = ChannelActivity(channel.id, len(recent_video_ids), tuple(recent_video_ids), max(published_ats) if published_ats else None)
+        if with_views:
+            self._add_recent_views(activities, [channel.id for channel in channels if channel.id], context)
+        return activities
+
+    def _add_recent_views(self, activities: Dict[str, ChannelActivity], channel_ids: Iterable[str], context: RequestContext) -> None:
+        pending: List[ChannelActivity] = [activities[channel_id] for channel_id in dict.fromkeys(channel_ids) if channel_id in activities and activities[channel_id].recent_views is None]
+        if not pending:
+            return
+        videos, _ = self.get_videos_by_ids((video_id for activity in pending for video_id in activity.recent_video_ids), context=context, mask=VIDEO_VIEWS_MASK)
+        views_by_id: Dict[str, int] = {video.id: int(video.statistics.viewCount) for video in videos if video.statistics.viewCount}
+        for activity in pending:
+            recent_views = sum([views_by_id.get(video_id, 0) for video_id in activity.recent_video_ids])
+            activities[activity.channel_id] = activity._replace(recent_views=recent_views)
+
+    def _filter_by_activity(self, channels: Iterable[Channel], min_activity: int = 1, time_delta: int = 14, activities: Optional[Dict[str, ChannelActivity]] = None, context: Optional[RequestContext] = None) -> List[Channel]:
+        channels = list(channels)
+        activities = self.get_channel_activities(channels, time_delta, activities, context=context)
         filtered_channels: List[Channel] = []
         for channel in channels:
-            all_videos: List[Video] = self._get_uploads(channel_info=channel)
-            recent_videos: List[Video] = [video for video in all_videos if self._isRecent(video, time_delta)]
-            if len(recent_videos) >= min_activity:
+            activity = activities.get(channel.id)
+            if activity and activity.recent_uploads >= min_activity:
                 filtered_channels.append(channel)
         return filtered_channels         
 
@@ -67,67 +348,109 @@ class YouTubeAPI:
         filtered_channels: List[Channel] = [channel for channel in channels if channel.statistics.subscriberCount]
         return sorted(filtered_channels, key=lambda x: int(x.statistics.subscriberCount), reverse=True)
     
-    def sort_by_recent_views(self, channels: Iterable[Channel], time_delta: int) -> List[Channel]:
+    def sort_by_recent_views(self, channels: Iterable[Channel], time_delta: int, activities: Optional[Dict[str, ChannelActivity]] = None, context: Optional[RequestContext] = None) -> List[Channel]:
+        """
+        Pass the activities collected by yield_small_channels so channels are not fetched again.
+        """
+        if activities is None:
+            activities = {}
+        channels = list(channels)
+        try:
+            self.get_channel_activities(channels, time_delta, activities, with_views=True, context=context)
+        except QuotaBudgetExceeded as err:
+            # Channels whose views could not be counted sort last.
+            print(err)
         channels_with_views: List[dict] = []
         for channel in channels:
-            all_videos: List[Video] = self._get_uploads(channel_info=channel)
-            recent_videos: List[Video] = [video for video in all_videos if self._isRecent(video, time_delta)]
-            recent_views: int = sum([int(video.statistics.viewCount) for video in recent_videos if video.statistics.viewCount])
-            channels_with_views.append({"channel": channel, "views": recent_views})
+            activity = activities.get(channel.id)
+            channels_with_views.append({"channel": channel, "views": (activity.recent_views or 0) if activity else 0})
         channels_with_views = sorted(channels_with_views, key=lambda d: d["views"], reverse=True)
         channels_sorted: List[Video] = [channel_views["channel"] for channel_views in channels_with_views]
         return channels_sorted   
 
-    def yield_small_channels(self, niche: str, num_channels: int = 100, time_delta: int = 14, subscriber_range: Tuple[int, int] = (1000, 200000)) -> Iterable[List[Channel]]:
-        channel_search = ChannelsSearch(query=niche, language=self.language, region=self.region)
+    def yield_small_channels(self, niche: str, num_channels: int = 100, time_delta: int = 14, subscriber_range: Tuple[int, int] = (1000, 200000), activities: Optional[Dict[str, ChannelActivity]] = None, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> Iterable[List[Channel]]:
+        """
+        The activity of every channel checked is added to activities, keyed by channel id.
+        """
+        if activities is None:
+            activities = {}
+        context = self._with_budget(context if context is not None else self.request_context(), max_quota)
+        context.raise_if_cancelled()
         channels: List[Channel] = []
-        while len(channels) <= num_channels:
-            channels_found = self._get_channels_from_search(channel_search, num_channels)
-            if not channels_found:
-                break
-            filtered_channels = self._filter_by_activity(self._filter_subscribers(channels_found, subscriber_range), time_delta=time_delta)
-            for channel in filtered_channels:
-                channels.append(channel)
-            try:
-                channel_search.next()
-            except:
-                break
-            yield channels
+        try:
+            channel_search = self._send(lambda: ChannelsSearch(query=niche, language=context.language, region=context.region), context)
+            # Search pages, channel lookups and the activity scans of three pages run at the same time.
+            stages = [
+                lambda channel_ids: self._filter_subscribers(self._hydrate_channels(channel_ids, context, num_channels), subscriber_range),
+                lambda channels_found: self._filter_by_activity(channels_found, time_delta=time_delta, activities=activities, context=context),
+            ]
+            with self._search_pipeline(channel_search, context, stages) as filtered_pages:
+                for filtered_channels in filtered_pages:
+                    for channel in filtered_channels:
+                        channels.append(channel)
+                    if len(channels) > num_channels:
+                        break
+                    yield channels
+        except QuotaBudgetExceeded as err:
+            # Out of budget: finish with what was found so far.
+            print(err)
         yield channels
 
-    def _get_uploads(self, channel_info: Channel) -> List[Video]:
+    def _scan_recent_uploads(self, channel_info: Channel, time_delta: int, context: RequestContext) -> List[PlaylistItem]:
+        """
+        Reads the uploads playlist, newest first, until it reaches an upload older than time_delta days.
+        Playlist items carry their video's publish date, so no video is fetched.
+        """
         uploads_id = channel_info.contentDetails.relatedPlaylists.uploads
         if not uploads_id:
             return []
+        items: List[PlaylistItem] = []
+        page_token: Optional[str] = None
+        for _ in range(MAX_UPLOAD_SCAN_PAGES):
+            params: Dict[str, Any] = {"playlistId": uploads_id, "part": UPLOADS_MASK.part, "fields": UPLOADS_MASK.fields, "maxResults": MAX_IDS_PER_REQUEST}
+            if page_token:
+                params["pageToken"] = page_token
+            response = self._call("playlistItems", context, **params)
+            page_items: List[PlaylistItem] = items_of(response, PlaylistItem)
+            items.extend(page_items)
+            published_ats = [item.contentDetails.videoPublishedAt for item in page_items if item.contentDetails.videoPublishedAt]
+            if any(not self._isRecentDate(published_at, time_delta) for published_at in published_ats):
+                break
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+        return items
+
+    def _scan_recent_uploads_or_none(self, channel_info: Channel, time_delta: int, context: RequestContext) -> Optional[List[PlaylistItem]]:
+        """
+        Per channel checks run side by side, so one failing channel must not fail the whole page.
+        """
         try:
-            uploads_items_res = self.api.get_playlist_items(playlist_id=uploads_id, count=10, limit=6).items
-        except:
-            uploads_items_res = []
-        videos = []
-        for item in uploads_items_res:
-            if not isinstance(item, PlaylistItem):
-                continue
-            video_id = item.contentDetails.videoId
-            if not video_id:
-                continue
-            video_res: List[Video] = self.api.get_video_by_id(video_id=video_id).items
-            if len(video_res) == 1:
-                video = video_res[0]
-                videos.append(video)
-        return videos
-    
+            return self._scan_recent_uploads(channel_info, time_delta, context)
+        except (SearchCancelled, QuotaBudgetExceeded):
+            raise
+        except Exception as err:
+            print(f"Could not fetch the uploads of channel {channel_info.id}: {err}")
+            return None
+
     def _isRecent(self, video: Video, time_delta: int) -> bool:
         """
         Time Delta is in days.
         """
-        unconv_video_time = video.snippet.publishedAt
+        return self._isRecentDate(video.snippet.publishedAt, time_delta)
+
+    def _isRecentDate(self, unconv_video_time: Optional[str], time_delta: int) -> bool:
+        """
+        Time Delta is in days.
+        """
         if not unconv_video_time:
             return False
         elif "T" not in unconv_video_time:
             return False
 
+        # publishedAt is in UTC, so today is too, as in the publishedAfter filter of the Data API search.
         video_time = datetime.datetime.strptime(unconv_video_time.split("T")[0], r"%Y-%m-%d")
-        minimum_time = datetime.datetime.now(video_time.tzinfo) - datetime.timedelta(days=time_delta)
+        minimum_time = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=time_delta)
         return bool(video_time.date()>minimum_time.date())
 
     @staticmethod
@@ -169,15 +492,20 @@ class YouTubeAPI:
         elif "T" not in unconv_video_time:
             return False
         video_time = datetime.datetime.strptime(unconv_video_time.split("T")[0], "%Y-%m-%d")
-        maximum_time = datetime.datetime.now(video_time.tzinfo) - datetime.timedelta(days=int(time_delta*365))
+        maximum_time = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=int(time_delta*365))
         return bool(video_time.date() < maximum_time.date())
 
-    def _isPushed(self, video: Video) -> Tuple[bool, float]:
+    def _isPushed(self, video: Video, channels_by_id: Optional[Dict[str, Channel]] = None, context: Optional[RequestContext] = None) -> Tuple[bool, float]:
+        """
+        channels_by_id should hold the channels already fetched for the page the video came from.
+        """
         views = video.statistics.viewCount
         channel_id = video.snippet.channelId
         if not views or not channel_id:
             return False, 0.0
-        channel = self.get_channel_info_by_id(channel_id=channel_id)
+        if channels_by_id is None:
+            channels_by_id = self.get_channels_by_ids([channel_id], context=context, mask=VIDEO_CHANNEL_MASK)
+        channel = channels_by_id.get(channel_id)
         if not channel:
             return False, 0.0
         subscribers = channel.statistics.subscriberCount
@@ -188,146 +516,214 @@ class YouTubeAPI:
         else:
             return False, 0.0
 
-    def _get_video_info_by_id(self, video_id: str, language: Optional[str] = None, region: Optional[str] = None) -> Optional[Video]:
-        if not language or not region:
-            language = self.language
-            region = self.region
-        video_info_list: List[Video] = self.api.get_video_by_id(video_id=video_id, hl=f"{language}_{region}").items
-        if len(video_info_list) == 1:
-            video_info: Video = video_info_list[0]
-            return video_info
+    def _get_video_info_by_id(self, video_id: str, language: Optional[str] = None, region: Optional[str] = None, context: Optional[RequestContext] = None, mask: FieldMask = VIDEO_MASK) -> Optional[Video]:
+        videos, _ = self.get_videos_by_ids([video_id], language=language, region=region, context=context, mask=mask)
+        if len(videos) == 1:
+            return videos[0]
         else:
             return None
 
-    def _get_videos_from_search(self, video_search: CustomSearch, language: str, region: str) -> List[Video]:
-        videos: List[Video] = []
-        try:
-            search_result = video_search.result()
-        except:
-            return []
-        if not isinstance(search_result, dict) or "result" not in search_result:
-            return videos
-        video_ids_found: Iterable[str] = [video["id"] for video in search_result["result"]]
-        for video_id in video_ids_found:
-            video_info = self._get_video_info_by_id(video_id=video_id, language=language, region=region)
-            if video_info:
-                videos.append(video_info)
+    def get_videos_by_ids(self, video_ids: Iterable[str], language: Optional[str] = None, region: Optional[str] = None, context: Optional[RequestContext] = None, mask: FieldMask = VIDEO_MASK) -> Tuple[List[Video], List[str]]:
+        """
+        Hydrates the videos with as few videos.list requests as possible, with only the fields in mask.
+        Returns the videos found, in the order requested, and the ids that could not be found.
+        language and region, when both given, override the market of the context.
+        """
+        context = self._in_market(context, language, region)
+        scope = self._cache_scope(context, mask)
+        unique_ids: List[str] = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+        cached = self.caches.videos.get_many(f"{scope}:{video_id}" for video_id in unique_ids)
+        videos_by_id: Dict[str, Video] = {key.rsplit(":", 1)[1]: video for key, video in cached.items()}
+        uncached_ids: List[str] = [video_id for video_id in unique_ids if video_id not in videos_by_id]
+        videos_by_id.update(self.in_flight.videos.run(scope, uncached_ids, partial(self._fetch_videos, context=context, mask=mask), context.cancel_token))
+        videos: List[Video] = [videos_by_id[video_id] for video_id in unique_ids if video_id in videos_by_id]
+        missing_ids: List[str] = [video_id for video_id in unique_ids if video_id not in videos_by_id]
+        return videos, missing_ids
+
+    def _fetch_videos(self, video_ids: List[str], context: RequestContext, mask: FieldMask) -> Dict[str, Video]:
+        videos_by_id: Dict[str, Video] = {}
+        for fetched in self._map(partial(self._fetch_videos_chunk, context=context, mask=mask), list(_chunked(video_ids))):
+            videos_by_id.update(fetched)
+        return videos_by_id
+
+    def _fetch_videos_chunk(self, chunk: List[str], context: RequestContext, mask: FieldMask) -> Dict[str, Video]:
+        scope = self._cache_scope(context, mask)
+        video_info_list: List[Video] = items_of(self._call("videos", context, id=",".join(chunk), part=mask.part, fields=mask.fields, hl=context.hl), Video)
+        fetched: Dict[str, Video] = {video_info.id: video_info for video_info in video_info_list if video_info.id}
+        self.caches.videos.put_many({f"{scope}:{video_id}": video_info for video_id, video_info in fetched.items()})
+        return fetched
+
+    def _hydrate_videos(self, video_ids_found: List[str], context: RequestContext) -> List[Video]:
+        videos, _ = self.get_videos_by_ids(video_ids_found, context=context)
         return videos
 
-    def _set_language_region(self, language: str, region: str) -> None:
-        self.language=language
-        self.region=region
+    @staticmethod
+    def _views(video: Video) -> int:
+        """
+        Parsed once per video, as the ranking key.
+        """
+        return int(video.statistics.viewCount or 0)
 
-    def yield_most_viewed_videos(self, niche: str, num_videos: int, language: str, region: str, time_delta: int = 14) -> Iterable[List[Video]]:
-        self._set_language_region(language, region)
-        video_search = CustomSearch(query=niche, searchPreferences=VideoSortOrder.uploadDate, language=language, region=region)
-        videos: List[Video] = []
+    def _video_search(self, niche: str, context: RequestContext, order: str = "date", published_after: Optional[str] = None, published_before: Optional[str] = None, video_duration: Optional[str] = None) -> Any:
+        """
+        The filters are only applied with the Data API backend, the scraped search is always by upload date
+        ("relevance" order gives the scraped default search, as used for Recycled).
+        """
+        context.raise_if_cancelled()
+        if self.search_backend == DATA_API_SEARCH:
+            return DataAPISearch(partial(self._call, context=context), niche, context.language, context.region, order=order, published_after=published_after, published_before=published_before, video_duration=video_duration)
+        elif order == "relevance":
+            return self._send(lambda: VideosSearch(query=niche, language=context.language, region=context.region), context)
+        return self._send(lambda: CustomSearch(query=niche, searchPreferences=VideoSortOrder.uploadDate, language=context.language, region=context.region), context)
+
+    def yield_most_viewed_videos(self, niche: str, num_videos: int, language: str, region: str, time_delta: int = 14, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> Iterable[List[Video]]:
+        context = self._with_budget(self._in_market(context, language, region), max_quota)
+        # The Data API returns the results most viewed first, so the first num_videos are the answer.
+        ranked_by_server = self.search_backend == DATA_API_SEARCH
+        filtered_by_server = self.search_backend == DATA_API_SEARCH
+        most_viewed: TopK[Video] = TopK(num_videos)
+        num_found = 0
         notRecent=False
-        while len(videos) < num_videos**20 and not notRecent:
-            videos_found = self._get_videos_from_search(video_search, language, region)
-            for video in videos_found:
-                if not self._isRecent(video, time_delta):
-                    videos_found.remove(video)
-                    notRecent=True
-            if not videos_found:
-                break
-            for video in videos_found:
-                videos.append(video)
-            try:
-                video_search.next()
-            except:
-                break
-            yield sorted(videos, key= lambda x: int(x.statistics.viewCount), reverse=True)[0: min(len(videos), num_videos)]
-        if videos:
-            most_viewed_videos = sorted(videos, key= lambda x: int(x.statistics.viewCount), reverse=True)[0: min(len(videos), num_videos)]
+        try:
+            video_search = self._video_search(niche, context, order="viewCount", published_after=days_ago_cutoff(time_delta))
+            with self._search_pipeline(video_search, context, [partial(self._hydrate_videos, context=context)]) as pages:
+                for videos_found in pages:
+                    if not videos_found:
+                        break
+                    recent_videos = [video for video in videos_found if self._isRecent(video, time_delta)]
+                    # The scraped search is newest first, so once one video is too old the rest are too. The Data
+                    # API filters by publish date itself, in any order, so one outside the window is only skipped.
+                    notRecent = len(recent_videos) < len(videos_found) and not filtered_by_server
+                    videos_found = recent_videos
+                    for video in videos_found:
+                        most_viewed.push(video, self._views(video))
+                    num_found += len(videos_found)
+                    if notRecent or num_found >= num_videos**20 or (ranked_by_server and num_found >= num_videos):
+                        break
+                    yield most_viewed.items()
+        except QuotaBudgetExceeded as err:
+            print(err)
+        if num_found:
+            most_viewed_videos = most_viewed.items()
             yield most_viewed_videos
 
-    def yield_small_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 14) -> Iterable[List[Video]]:
-        self._set_language_region(language, region)
-        video_search = CustomSearch(query=niche, searchPreferences=VideoSortOrder.uploadDate, language=language, region=region)
-        videos: List[Video] = []
+    def yield_small_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 14, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> Iterable[List[Video]]:
+        context = self._with_budget(self._in_market(context, language, region), max_quota)
+        small_videos: TopK[Video] = TopK(num_videos)
+        filtered_by_server = self.search_backend == DATA_API_SEARCH
+        num_found = 0
         notRecent=False
-        while len(videos) < num_videos**20 and not notRecent:
-            videos_found = self._get_videos_from_search(video_search, language, region)
-            for video in videos_found:
-                if not self._isRecent(video, time_delta):
-                    videos_found.remove(video)
-                    notRecent=True
-            if not videos_found:
-                break
-            for video in videos_found:
-                if self._isShort(video):
-                    videos.append(video)
-            try:
-                video_search.next()
-            except:
-                break
-            yield sorted(videos, key= lambda x: int(x.statistics.viewCount), reverse=True)[0: min(len(videos), num_videos)]
-        if videos:
-            small_videos_by_views = sorted(videos, key= lambda x: int(x.statistics.viewCount), reverse=True)[0: min(len(videos), num_videos)]
+        try:
+            # videoDuration=short is YouTube's own "under 4 minutes" filter.
+            video_search = self._video_search(niche, context, published_after=days_ago_cutoff(time_delta), video_duration="short")
+            with self._search_pipeline(video_search, context, [partial(self._hydrate_videos, context=context)]) as pages:
+                for videos_found in pages:
+                    if not videos_found:
+                        break
+                    recent_videos = [video for video in videos_found if self._isRecent(video, time_delta)]
+                    # The scraped search is newest first, so once one video is too old the rest are too. The Data
+                    # API filters by publish date itself, in any order, so one outside the window is only skipped.
+                    notRecent = len(recent_videos) < len(videos_found) and not filtered_by_server
+                    videos_found = recent_videos
+                    for video in videos_found:
+                        if self._isShort(video):
+                            small_videos.push(video, self._views(video))
+                            num_found += 1
+                    if notRecent or num_found >= num_videos**20:
+                        break
+                    yield small_videos.items()
+        except QuotaBudgetExceeded as err:
+            print(err)
+        if num_found:
+            small_videos_by_views = small_videos.items()
             yield small_videos_by_views
 
-    def yield_pushed_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 14) -> Iterable[List[Video]]:
-        self._set_language_region(language, region)
-        video_search = CustomSearch(query=niche, searchPreferences=VideoSortOrder.uploadDate, language=language, region=region)
-        videos_with_score: List[dict] = []
+    def yield_pushed_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 14, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> Iterable[List[Video]]:
+        context = self._with_budget(self._in_market(context, language, region), max_quota)
+        most_pushed: TopK[Video] = TopK(num_videos)
+        filtered_by_server = self.search_backend == DATA_API_SEARCH
+        num_found = 0
         notRecent=False
-        while len(videos_with_score) < num_videos and not notRecent:
-            videos_found = self._get_videos_from_search(video_search, language=self.language, region=self.region)
-            for video in videos_found:
-                if not self._isRecent(video, time_delta):
-                    videos_found.remove(video)
-                    notRecent=True
-            if not videos_found:
-                break
-            for video in videos_found:
-                isPushed, score = self._isPushed(video)
-                if isPushed:
-                    videos_with_score.append({"video": video, "score": score})
-            try:
-                video_search.next()
-            except:
-                break
-            yield [video_dict["video"] for video_dict in sorted(videos_with_score, key= lambda x: x["score"], reverse=True)[0: min(len(videos_with_score), num_videos)]]
-        if videos_with_score:
-            sorted_by_score: List[dict] = sorted(videos_with_score, key= lambda x: x["score"], reverse=True)[0: min(len(videos_with_score), num_videos)]
-            most_pushed_videos = [video_dict["video"] for video_dict in sorted_by_score]
+        try:
+            video_search = self._video_search(niche, context, published_after=days_ago_cutoff(time_delta))
+            # The channels of a page are looked up while the page after it is hydrated.
+            stages: List[Callable[[Any], Any]] = [
+                partial(self._hydrate_videos, context=context),
+                lambda videos_found: (videos_found, self.get_channels_by_ids((video.snippet.channelId for video in videos_found if self._isRecent(video, time_delta)), context=context, mask=VIDEO_CHANNEL_MASK)),
+            ]
+            with self._search_pipeline(video_search, context, stages) as pages:
+                for videos_found, channels_by_id in pages:
+                    if not videos_found:
+                        break
+                    recent_videos = [video for video in videos_found if self._isRecent(video, time_delta)]
+                    # The scraped search is newest first, so once one video is too old the rest are too. The Data
+                    # API filters by publish date itself, in any order, so one outside the window is only skipped.
+                    notRecent = len(recent_videos) < len(videos_found) and not filtered_by_server
+                    videos_found = recent_videos
+                    for video in videos_found:
+                        isPushed, score = self._isPushed(video, channels_by_id)
+                        if isPushed:
+                            most_pushed.push(video, score)
+                            num_found += 1
+                    if notRecent or num_found >= num_videos:
+                        break
+                    yield most_pushed.items()
+        except QuotaBudgetExceeded as err:
+            print(err)
+        if num_found:
+            most_pushed_videos = most_pushed.items()
             yield most_pushed_videos
 
-    def yield_old_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 2) -> Iterable[List[Video]]:
-        self._set_language_region(language, region)
-        video_search = VideosSearch(query=niche, language=language, region=region)
+    def yield_old_videos(self, niche: str, language: str, region: str, num_videos: int = 100, time_delta: int = 2, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> Iterable[List[Video]]:
+        context = self._with_budget(self._in_market(context, language, region), max_quota)
         videos: List[Video] = []
-        while len(videos) < num_videos:
-            videos_found = self._get_videos_from_search(video_search, language=self.language, region=self.region, max_videos=num_videos)
-            if not videos_found:
-                break
-            for video in videos_found:
-                if self._isOldVideo(video, time_delta):
-                    videos.append(video)
-            try:
-                video_search.next()
-            except:
-                break
-            yield videos
+        try:
+            video_search = self._video_search(niche, context, order="relevance", published_before=years_ago_cutoff(time_delta))
+            with self._search_pipeline(video_search, context, [partial(self._hydrate_videos, context=context)], max_results=num_videos) as pages:
+                for videos_found in pages:
+                    if not videos_found:
+                        break
+                    for video in videos_found:
+                        if self._isOldVideo(video, time_delta):
+                            videos.append(video)
+                    if len(videos) >= num_videos:
+                        break
+                    yield videos
+        except QuotaBudgetExceeded as err:
+            print(err)
         yield videos
 
-    def _get_comment_from_id(self, comment_id: str) -> Optional[Comment]:
-        comment_info_list: List[Comment] = self.api.get_comment_by_id(comment_id=comment_id).items
-        if len(comment_info_list) == 1:
-            comment_info: Comment = comment_info_list[0]
-            return comment_info
-        else:
-            return None
+    def _get_comments_by_ids(self, comment_ids: Iterable[str], context: RequestContext) -> List[Comment]:
+        """
+        Fetches the comments with as few comments.list requests as possible, in the order requested.
+        Ids that could not be found are left out.
+        """
+        unique_ids: List[str] = list(dict.fromkeys(comment_id for comment_id in comment_ids if comment_id))
+        cached = self.caches.comments.get_many(f"{COMMENT_MASK.name}:{comment_id}" for comment_id in unique_ids)
+        comments_by_id: Dict[str, Comment] = {key.rsplit(":", 1)[1]: comment for key, comment in cached.items()}
+        uncached_ids: List[str] = [comment_id for comment_id in unique_ids if comment_id not in comments_by_id]
+        for fetched in self._map(partial(self._fetch_comments_chunk, context=context), list(_chunked(uncached_ids))):
+            comments_by_id.update(fetched)
+        return [comments_by_id[comment_id] for comment_id in unique_ids if comment_id in comments_by_id]
+
+    def _fetch_comments_chunk(self, chunk: List[str], context: RequestContext) -> Dict[str, Comment]:
+        comment_info_list: List[Comment] = items_of(self._call("comments", context, id=",".join(chunk), part=COMMENT_MASK.part, fields=COMMENT_MASK.fields, textFormat="html"), Comment)
+        fetched: Dict[str, Comment] = {comment_info.id: comment_info for comment_info in comment_info_list if comment_info.id}
+        self.caches.comments.put_many({f"{COMMENT_MASK.name}:{comment_id}": comment_info for comment_id, comment_info in fetched.items()})
+        return fetched
 
-    def yield_comments(self, video_id: str, query: Optional[str] = None, num_comments: int = 100) -> Iterable[List[Comment]]:
-        comment_search = Comments(video_id)
+    def yield_comments(self, video_id: str, query: Optional[str] = None, num_comments: int = 100, max_quota: Optional[int] = None, context: Optional[RequestContext] = None) -> Iterable[List[Comment]]:
+        context = self._with_budget(context if context is not None else self.request_context(), max_quota)
+        context.raise_if_cancelled()
+        comment_search = self._send(lambda: Comments(video_id), context)
         while comment_search.hasMoreComments:
+            context.raise_if_cancelled()
             try:
-                comment_search.getNextComments()
+                # Moves the scraper's continuation on, like search.next().
+                self._send(comment_search.getNextComments, context, retry=False)
                 comment_result = comment_search.comments
                 comment_ids = [comment["id"] for comment in comment_result["result"]]
-                comments: List[Comment] = [self._get_comment_from_id(comment_id) for comment_id in comment_ids]
+                comments: List[Comment] = self._get_comments_by_ids(comment_ids, context)
                 if query:
                     seperated_query = query.lower().split(" ")
                     comments_with_query = [comment for comment in comments if comment.snippet.textDisplay and any([_query in comment.snippet.textDisplay.lower() for _query in seperated_query])]
@@ -339,7 +735,7 @@ class YouTubeAPI:
                     return []
                 elif len(comment_result["result"]) > num_comments:
                     break
-            except TypeError as err:
+            except (TypeError, QuotaBudgetExceeded) as err:
                 print(err)
                 break
         